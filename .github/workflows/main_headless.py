@@ -4,20 +4,59 @@
 import os
 import sys
 import json
+import time
+from pathlib import Path
 from dotenv import load_dotenv
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Load environment
 load_dotenv()
 
+# Access tokens last ~1 hour; cache them so frequent scheduled runs don't
+# hit the token endpoint every time (persist via actions/cache in CI)
+TOKEN_CACHE_FILE = Path(os.getenv('SPOTIFY_TOKEN_CACHE', '/tmp/spotify_token.json'))
+
+def _load_cached_token():
+    """Return a still-valid cached access token, or None."""
+    try:
+        raw = TOKEN_CACHE_FILE.read_bytes()
+        token_info = orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+        # Leave a 60s safety margin before expiry
+        if token_info.get('expires_at', 0) - 60 > time.time():
+            return token_info
+    except (FileNotFoundError, ValueError):
+        pass
+    return None
+
+def _save_cached_token(token_info):
+    """Persist token info for subsequent runs."""
+    try:
+        if HAS_ORJSON:
+            TOKEN_CACHE_FILE.write_bytes(orjson.dumps(token_info))
+        else:
+            TOKEN_CACHE_FILE.write_text(json.dumps(token_info))
+    except OSError as e:
+        print(f"Warning: could not cache token: {e}")
+
 def get_spotify_token():
     """Get Spotify access token using stored refresh token."""
-    
+
     # Check if we have a stored refresh token
     refresh_token = os.getenv('SPOTIFY_REFRESH_TOKEN')
-    
+
     if refresh_token:
+        # Reuse a cached access token if it hasn't expired yet
+        cached = _load_cached_token()
+        if cached:
+            return spotipy.Spotify(auth=cached['access_token'])
+
         # Use refresh token to get new access token
         auth_manager = SpotifyOAuth(
             client_id=os.getenv('SPOTIFY_CLIENT_ID'),
@@ -25,18 +64,12 @@ def get_spotify_token():
             redirect_uri=os.getenv('SPOTIFY_REDIRECT_URI'),
             scope="user-read-recently-played"
         )
-        
-        # Set the refresh token
-        token_info = {
-            'refresh_token': refresh_token,
-            'access_token': None,
-            'expires_at': 0
-        }
-        
-        # Get fresh access token
+
+        # Get fresh access token and cache it for the next run
         token_info = auth_manager.refresh_access_token(refresh_token)
+        _save_cached_token(token_info)
         return spotipy.Spotify(auth_manager=auth_manager)
-    
+
     else:
         print("No refresh token found. Run locally first to authenticate.")
         return None
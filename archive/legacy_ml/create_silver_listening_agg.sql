@@ -0,0 +1,28 @@
+-- SILVER LISTENING AGGREGATE DYNAMIC TABLE
+-- Precomputes the per-play window counts (replay/genre/artist popularity)
+-- that the fine-tuning analyzers recompute on every run. A dynamic table
+-- refreshes incrementally, so the analyzers become cheap filtered scans.
+-- (Materialized views can't hold window functions in Snowflake; dynamic
+-- tables are also the pattern used by create_ml_dynamic_tables.sql.)
+USE DATABASE spotify_analytics;
+USE SCHEMA medallion_arch;
+
+CREATE OR REPLACE DYNAMIC TABLE silver_listening_agg_dt
+TARGET_LAG = '15 minutes'
+WAREHOUSE = 'spotify_analytics_wh'
+AS
+SELECT
+    track_id,
+    track_name,
+    primary_artist_name,
+    primary_artist_id,
+    primary_genre,
+    album_name,
+    track_popularity,
+    denver_date,
+    denver_hour,
+    is_weekend,
+    COUNT(*) OVER (PARTITION BY track_id) AS track_replay_count,
+    COUNT(*) OVER (PARTITION BY primary_genre) AS genre_popularity,
+    COUNT(*) OVER (PARTITION BY primary_artist_id) AS artist_popularity
+FROM silver_listening_enriched;
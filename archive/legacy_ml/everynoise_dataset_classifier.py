@@ -4,6 +4,9 @@ Every Noise Dataset Genre Classifier
 Uses the Every Noise dataset and site structure for genre classification.
 """
 
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 import json
 import time
@@ -11,28 +14,141 @@ import re
 import csv
 from typing import Dict, List, Optional, Set
 from urllib.parse import quote, unquote
+import aiohttp
 import structlog
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from difflib import SequenceMatcher
 
+try:
+    from rapidfuzz import fuzz, process as fuzz_process
+    HAS_RAPIDFUZZ = True
+except ImportError:
+    HAS_RAPIDFUZZ = False
+
+try:
+    import requests_cache
+    HAS_REQUESTS_CACHE = True
+except ImportError:
+    HAS_REQUESTS_CACHE = False
+
+# Prefer C-backed HTML parsing; html.parser is the pure-Python last resort
+try:
+    from selectolax.parser import HTMLParser as SelectolaxParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+try:
+    import lxml  # noqa: F401
+    BS4_PARSER = 'lxml'
+except ImportError:
+    BS4_PARSER = 'html.parser'
+
 logger = structlog.get_logger(__name__)
 
+# Concurrency limits for the async fetch path - stay polite to everynoise.com
+MAX_CONCURRENT_FETCHES = 8
+KEEPALIVE_TIMEOUT = 30
+
+# Precompiled name-pattern -> candidate-genre rules, checked in order.
+# Compiling once at module scope avoids rebuilding lists and rescanning
+# the name four times per artist during batch classification.
+GENRE_RULES = (
+    (re.compile(r'dj[ _]|electronic'), ('electronic', 'house', 'techno', 'edm', 'dance')),
+    (re.compile(r'lil |young |big |mc '), ('hip hop', 'rap', 'trap', 'hip-hop')),
+    (re.compile(r'band|rock'), ('rock', 'indie rock', 'alternative rock', 'pop rock')),
+    (re.compile(r'pop'), ('pop', 'indie pop', 'electropop')),
+)
+# Default candidates for unknown artists
+DEFAULT_CANDIDATES = ('pop', 'indie', 'alternative', 'rock', 'electronic', 'hip hop')
+
+@functools.lru_cache(maxsize=8192)
+def _candidate_genres(name_lower: str) -> tuple:
+    """Candidate genres for a lowercased artist name, memoized per name."""
+    for pattern, candidates in GENRE_RULES:
+        if pattern.search(name_lower):
+            return candidates[:5]
+    return DEFAULT_CANDIDATES[:5]  # Limit to top 5 candidates
+
 class EveryNoiseDatasetClassifier:
     """Classifier using Every Noise dataset and site structure."""
-    
+
+
     def __init__(self):
         self.base_url = "https://everynoise.com"
-        self.session = requests.Session()
+        # Persist fetched pages on disk when requests-cache is installed so
+        # repeat runs skip the network entirely
+        if HAS_REQUESTS_CACHE:
+            self.session = requests_cache.CachedSession(
+                'everynoise_cache', backend='sqlite', expire_after=86400
+            )
+        else:
+            self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
         })
+
+        # Pool connections and retry transient failures so TCP/TLS handshakes
+        # amortize across the many genre page fetches
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET'])
+        )
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
-        # Cache for mappings
+        # Cache for mappings, persisted across runs so scheduled invocations
+        # (e.g. GitHub Actions) don't re-pay the HTTP cost for known artists
+        self.cache_file = "everynoise_artist_cache.json"
         self.artist_genre_cache = {}
+        self._load_artist_cache()
         self.genre_data = {}
+        self._genre_columns: Dict[str, int] = {}
+        # Direct artist->genre index built from the dataset CSV; a hit here
+        # answers a lookup without touching the network at all
+        self._artist_to_genre: Dict[str, str] = {}
+        # Per-genre artist name sets extracted from downloaded pages
+        self._genre_artists: Dict[str, frozenset] = {}
+        # Lowercased raw page text for the parse-free substring fast path
+        self._page_text_lower: Dict[str, str] = {}
+        # In-process memo of downloaded genre pages: each candidate genre is
+        # fetched at most once per batch (None marks a known-missing page)
+        self._page_cache: Dict[str, Optional[str]] = {}
+        # Canonical page URL per genre, resolved once via cheap HEAD probes
+        # so the 404-then-refetch fallback never repeats for a genre
+        self._genre_url_map: Dict[str, str] = {}
         
         logger.info("Every Noise Dataset Classifier initialized")
-    
+
+    def _load_artist_cache(self):
+        """Load the persisted artist->genre cache from previous runs."""
+        try:
+            with open(self.cache_file, 'r') as f:
+                self.artist_genre_cache = json.load(f)
+            logger.info("Loaded artist genre cache", count=len(self.artist_genre_cache))
+        except FileNotFoundError:
+            logger.info("No existing artist genre cache found, starting fresh")
+        except Exception as e:
+            logger.error("Failed to load artist genre cache", error=str(e))
+            self.artist_genre_cache = {}
+
+    def _save_artist_cache(self):
+        """Save the artist->genre cache so subsequent runs skip resolved artists."""
+        try:
+            with open(self.cache_file, 'w') as f:
+                json.dump(self.artist_genre_cache, f, indent=2)
+            logger.debug("Saved artist genre cache", count=len(self.artist_genre_cache))
+        except Exception as e:
+            logger.error("Failed to save artist genre cache", error=str(e))
+
+
     def download_everynoise_dataset(self) -> bool:
         """
         Download the Every Noise dataset from GitHub.
@@ -66,14 +182,23 @@ class EveryNoiseDatasetClassifier:
             True if successful, False otherwise
         """
         try:
-            with open('everynoise_genres.csv', 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    genre = row.get('genre', '').strip()
-                    if genre:
-                        self.genre_data[genre] = row
-            
-            logger.info("Loaded Every Noise dataset", genres_count=len(self.genre_data))
+            with open('everynoise_genres.csv', 'r', encoding='utf-8', newline='') as f:
+                # csv.reader + one comprehension avoids DictReader's per-row
+                # dict allocation; keep the header for column index lookups
+                reader = csv.reader(f)
+                header = next(reader, [])
+                self._genre_columns = {name: i for i, name in enumerate(header)}
+                gi = self._genre_columns.get('genre', 0)
+                self.genre_data = {
+                    row[gi].strip(): row
+                    for row in reader
+                    if len(row) > gi and row[gi].strip()
+                }
+
+            self._build_artist_index()
+            logger.info("Loaded Every Noise dataset",
+                       genres_count=len(self.genre_data),
+                       indexed_artists=len(self._artist_to_genre))
             return True
             
         except FileNotFoundError:
@@ -85,6 +210,21 @@ class EveryNoiseDatasetClassifier:
             logger.error("Failed to load Every Noise dataset", error=str(e))
             return False
     
+    def _build_artist_index(self):
+        """Build the artist->genre lookup from any artist-bearing CSV columns."""
+        artist_columns = [index for name, index in self._genre_columns.items()
+                          if 'artist' in name.lower()]
+        if not artist_columns:
+            return
+
+        for genre, row in self.genre_data.items():
+            for column in artist_columns:
+                if column < len(row) and row[column]:
+                    for name in row[column].split(','):
+                        key = name.strip().lower()
+                        if key:
+                            self._artist_to_genre.setdefault(key, genre)
+
     def search_artist_by_genre_exploration(self, artist_name: str) -> Optional[str]:
         """
         Search for artist by exploring genre pages on Every Noise.
@@ -102,7 +242,13 @@ class EveryNoiseDatasetClassifier:
         cache_key = artist_name.lower().strip()
         if cache_key in self.artist_genre_cache:
             return self.artist_genre_cache[cache_key]
-        
+
+        # Dataset index answers without any HTTP
+        indexed_genre = self._artist_to_genre.get(cache_key)
+        if indexed_genre:
+            self.artist_genre_cache[cache_key] = indexed_genre
+            return indexed_genre
+
         try:
             # Try the main site with artist search
             search_url = f"{self.base_url}/engenremap.html"
@@ -111,23 +257,29 @@ class EveryNoiseDatasetClassifier:
             response.raise_for_status()
             
             # Look for artist in the main genre map
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, BS4_PARSER)
             
             # Find all genre links
             genre_links = soup.find_all('a', href=True)
             
-            # Try a few promising genres based on common patterns
+            # Try a few promising genres based on common patterns. The checks
+            # are I/O-bound, so run them concurrently over the pooled session
+            # and return as soon as any candidate hits.
             candidate_genres = self._get_candidate_genres_for_artist(artist_name)
-            
-            for genre in candidate_genres:
-                found_genre = self._check_artist_in_genre(artist_name, genre)
-                if found_genre:
-                    self.artist_genre_cache[cache_key] = found_genre
-                    return found_genre
-                    
-                # Rate limiting
-                time.sleep(0.5)
-            
+
+            with ThreadPoolExecutor(max_workers=len(candidate_genres) or 1) as executor:
+                futures = {
+                    executor.submit(self._check_artist_in_genre, artist_name, genre): genre
+                    for genre in candidate_genres
+                }
+                for future in as_completed(futures):
+                    found_genre = future.result()
+                    if found_genre:
+                        for pending in futures:
+                            pending.cancel()
+                        self.artist_genre_cache[cache_key] = found_genre
+                        return found_genre
+
             # If not found in candidate genres, return None
             self.artist_genre_cache[cache_key] = None
             return None
@@ -138,23 +290,7 @@ class EveryNoiseDatasetClassifier:
     
     def _get_candidate_genres_for_artist(self, artist_name: str) -> List[str]:
         """Get candidate genres to check for an artist based on name patterns."""
-        candidates = []
-        name_lower = artist_name.lower()
-        
-        # Genre inference based on artist name patterns
-        if any(pattern in name_lower for pattern in ['dj ', 'dj_', 'electronic']):
-            candidates.extend(['electronic', 'house', 'techno', 'edm', 'dance'])
-        elif any(pattern in name_lower for pattern in ['lil ', 'young ', 'big ', 'mc ']):
-            candidates.extend(['hip hop', 'rap', 'trap', 'hip-hop'])
-        elif 'band' in name_lower or 'rock' in name_lower:
-            candidates.extend(['rock', 'indie rock', 'alternative rock', 'pop rock'])
-        elif 'pop' in name_lower:
-            candidates.extend(['pop', 'indie pop', 'electropop'])
-        else:
-            # Default candidates for unknown artists
-            candidates.extend(['pop', 'indie', 'alternative', 'rock', 'electronic', 'hip hop'])
-        
-        return candidates[:5]  # Limit to top 5 candidates
+        return list(_candidate_genres(artist_name.lower()))
     
     def _check_artist_in_genre(self, artist_name: str, genre: str) -> Optional[str]:
         """
@@ -168,46 +304,202 @@ class EveryNoiseDatasetClassifier:
             Genre if artist found, None otherwise
         """
         try:
-            # Format genre for URL
-            genre_url_safe = quote(genre.replace(' ', ''))
-            genre_page_url = f"{self.base_url}/engenremap-{genre_url_safe}.html"
-            
-            response = self.session.get(genre_page_url, timeout=10)
-            
-            # If page doesn't exist, try alternative format
-            if response.status_code == 404:
-                genre_url_safe = quote(genre.replace(' ', '_'))
-                genre_page_url = f"{self.base_url}/engenremap-{genre_url_safe}.html"
-                response = self.session.get(genre_page_url, timeout=10)
-            
-            if response.status_code != 200:
+            page_html = self._get_genre_page(genre)
+            if page_html is None:
                 return None
-            
-            # Parse the genre page
-            soup = BeautifulSoup(response.text, 'html.parser')
-            page_text = soup.get_text().lower()
-            
-            # Look for artist name in the page
-            artist_lower = artist_name.lower()
-            
-            # Direct match
-            if artist_lower in page_text:
+
+            return self._match_artist_in_page(artist_name, page_html, genre)
+
+        except Exception as e:
+            logger.debug("Failed to check artist in genre", artist=artist_name, genre=genre, error=str(e))
+            return None
+
+    def _resolve_genre_url(self, genre: str) -> Optional[str]:
+        """Find the canonical URL format for a genre with HEAD probes.
+
+        The winner is cached so no later fetch pays the 404 fallback again;
+        a None entry in the page cache marks genres missing in both formats.
+        """
+        if genre in self._genre_url_map:
+            return self._genre_url_map[genre]
+
+        for url in self._genre_page_urls(genre):
+            try:
+                response = self.session.head(url, timeout=10)
+            except requests.RequestException:
+                return None
+            if response.status_code == 200:
+                self._genre_url_map[genre] = url
+                return url
+            if response.status_code != 404:
+                break
+        return None
+
+    def _get_genre_page(self, genre: str) -> Optional[str]:
+        """Download a genre page, memoizing the result for the process lifetime."""
+        if genre in self._page_cache:
+            return self._page_cache[genre]
+
+        page_html = None
+        url = self._resolve_genre_url(genre)
+        if url:
+            response = self.session.get(url, timeout=10)
+            if response.status_code == 200:
+                page_html = response.text
+
+        self._page_cache[genre] = page_html
+        return page_html
+
+    @staticmethod
+    def _extract_artists_from_page(page_html: str) -> frozenset:
+        """Extract the set of lowercased artist names from a genre page."""
+        # Every Noise lists artists as anchors inside the genre map divs
+        if HAS_SELECTOLAX:
+            tree = SelectolaxParser(page_html)
+            names = {node.text(strip=True).lower()
+                     for node in tree.css('a')
+                     if node.text(strip=True)}
+        else:
+            soup = BeautifulSoup(page_html, BS4_PARSER)
+            names = {a.get_text().strip().lower()
+                     for a in soup.find_all('a')
+                     if a.get_text().strip()}
+        return frozenset(names)
+
+    def _match_artist_in_page(self, artist_name: str, page_html: str, genre: str) -> Optional[str]:
+        """Match an artist against a downloaded genre page (shared by sync and async paths)."""
+        artist_lower = artist_name.lower()
+
+        # Fast path: before paying for HTML parsing, scan the raw page with
+        # str.__contains__ (C-implemented two-way search). A hit settles the
+        # exact-match branch without building any tree.
+        if genre not in self._genre_artists:
+            if genre not in self._page_text_lower:
+                self._page_text_lower[genre] = page_html.lower()
+            if artist_lower in self._page_text_lower[genre]:
                 logger.info("Found artist in genre page", artist=artist_name, genre=genre)
                 return genre
-            
-            # Fuzzy matching for similar names
-            words = page_text.split()
-            for word in words:
-                if len(word) > 3 and SequenceMatcher(None, artist_lower, word).ratio() > 0.8:
-                    logger.info("Found similar artist in genre page", 
-                               artist=artist_name, similar_word=word, genre=genre)
+            # Raw scan missed: parse once for the fuzzy pass and future lookups
+            self._genre_artists[genre] = self._extract_artists_from_page(page_html)
+            self._page_text_lower.pop(genre, None)
+        artist_set = self._genre_artists[genre]
+
+        # Direct match
+        if artist_lower in artist_set:
+            logger.info("Found artist in genre page", artist=artist_name, genre=genre)
+            return genre
+
+        # Fuzzy matching for similar names
+        if HAS_RAPIDFUZZ:
+            match = fuzz_process.extractOne(artist_lower, artist_set,
+                                            scorer=fuzz.ratio, score_cutoff=80)
+            if match:
+                logger.info("Found similar artist in genre page",
+                           artist=artist_name, similar_word=match[0], genre=genre)
+                return genre
+        else:
+            for name in artist_set:
+                if len(name) > 3 and SequenceMatcher(None, artist_lower, name).ratio() > 0.8:
+                    logger.info("Found similar artist in genre page",
+                               artist=artist_name, similar_word=name, genre=genre)
                     return genre
-            
-            return None
-            
-        except Exception as e:
-            logger.debug("Failed to check artist in genre", artist=artist_name, genre=genre, error=str(e))
+
+        return None
+
+    def _genre_page_urls(self, genre: str) -> List[str]:
+        """Candidate URLs for a genre page (primary format, then underscore fallback)."""
+        return [
+            f"{self.base_url}/engenremap-{quote(genre.replace(' ', ''))}.html",
+            f"{self.base_url}/engenremap-{quote(genre.replace(' ', '_'))}.html",
+        ]
+
+    async def _fetch_genre_page(self, session: aiohttp.ClientSession, genre: str) -> Optional[str]:
+        """Fetch a genre page, trying the fallback URL format on 404."""
+        if genre in self._page_cache:
+            return self._page_cache[genre]
+
+        page_html = None
+        known_url = self._genre_url_map.get(genre)
+        urls = [known_url] if known_url else self._genre_page_urls(genre)
+        for url in urls:
+            try:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    if response.status == 200:
+                        page_html = await response.text()
+                        self._genre_url_map[genre] = url
+                        break
+                    if response.status != 404:
+                        break
+            except Exception as e:
+                logger.debug("Failed to fetch genre page", genre=genre, url=url, error=str(e))
+                break
+
+        self._page_cache[genre] = page_html
+        return page_html
+
+    async def _fetch_one(self, sem: asyncio.BoundedSemaphore,
+                         session: aiohttp.ClientSession, genre: str) -> None:
+        """Fetch a single genre page under the concurrency semaphore."""
+        async with sem:
+            await self._fetch_genre_page(session, genre)
+            # Stay polite: brief pause while holding the slot
+            await asyncio.sleep(0.1)
+
+    def _resolve_from_cached_pages(self, artist_name: str) -> Optional[str]:
+        """Resolve one artist against already-downloaded candidate genre pages."""
+        if not artist_name:
             return None
+
+        cache_key = artist_name.lower().strip()
+        if cache_key in self.artist_genre_cache:
+            return self.artist_genre_cache[cache_key]
+
+        indexed_genre = self._artist_to_genre.get(cache_key)
+        if indexed_genre:
+            self.artist_genre_cache[cache_key] = indexed_genre
+            return indexed_genre
+
+        for genre in self._get_candidate_genres_for_artist(artist_name):
+            page_html = self._page_cache.get(genre)
+            if page_html and self._match_artist_in_page(artist_name, page_html, genre):
+                self.artist_genre_cache[cache_key] = genre
+                return genre
+
+        self.artist_genre_cache[cache_key] = None
+        return None
+
+    async def _classify_artists_async(self, artist_names: List[str]) -> List[Optional[str]]:
+        """Classify a batch of artists against Every Noise genre pages.
+
+        Artists sharing candidate genres reuse the same pages, so the batch
+        first fetches each unique uncached genre page exactly once, then
+        resolves every artist locally against the cached artist sets.
+        """
+        # Candidate genres for artists not answerable from cache or dataset index
+        unresolved = [name for name in artist_names
+                      if name and name.lower().strip() not in self.artist_genre_cache
+                      and name.lower().strip() not in self._artist_to_genre]
+        needed_genres = []
+        for name in unresolved:
+            for genre in self._get_candidate_genres_for_artist(name):
+                if genre not in self._page_cache and genre not in needed_genres:
+                    needed_genres.append(genre)
+
+        if needed_genres:
+            sem = asyncio.BoundedSemaphore(MAX_CONCURRENT_FETCHES)
+            connector = aiohttp.TCPConnector(
+                limit_per_host=MAX_CONCURRENT_FETCHES,
+                keepalive_timeout=KEEPALIVE_TIMEOUT
+            )
+            async with aiohttp.ClientSession(
+                connector=connector,
+                headers=dict(self.session.headers)
+            ) as session:
+                await asyncio.gather(*[
+                    self._fetch_one(sem, session, genre) for genre in needed_genres
+                ])
+
+        return [self._resolve_from_cached_pages(name) for name in artist_names]
     
     def classify_artists_with_everynoise(self, artists_data: List[Dict]) -> List[Dict]:
         """
@@ -219,47 +511,58 @@ class EveryNoiseDatasetClassifier:
         Returns:
             Enhanced artist data with Every Noise genres
         """
+        # Collect the artists that actually need a lookup, then resolve them
+        # concurrently - N serial round-trips become one bounded async batch.
+        to_classify = [artist for artist in artists_data
+                       if artist and not artist.get('genres', [])]
+
+        # Fast path: everything is already labeled, skip the event loop and
+        # stats bookkeeping entirely
+        if not to_classify:
+            logger.info("All artists already have genres, skipping Every Noise lookup",
+                       total_artists=len(artists_data))
+            return [artist for artist in artists_data if artist]
+
         enhanced_artists = []
-        processed_count = 0
         found_count = 0
-        
+
+        names = [artist.get('name', '') for artist in to_classify]
+        genres = asyncio.run(self._classify_artists_async(names))
+        genre_by_name = dict(zip(names, genres))
+
         for artist in artists_data:
             if not artist:
                 continue
-                
+
             artist_name = artist.get('name', '')
             original_genres = artist.get('genres', [])
-            
+
             # If artist already has genres, keep them
             if original_genres:
                 enhanced_artists.append(artist)
                 continue
-            
-            # Try to find genre using Every Noise
-            everynoise_genre = self.search_artist_by_genre_exploration(artist_name)
-            
+
+            everynoise_genre = genre_by_name.get(artist_name)
+
             if everynoise_genre:
                 enhanced_artist = artist.copy()
                 enhanced_artist['genres'] = [everynoise_genre]
                 enhanced_artist['genre_inference_methods'] = ['everynoise_exploration']
                 enhanced_artist['original_genres_empty'] = True
-                
+
                 logger.info("Enhanced artist with Every Noise genre",
                            artist_name=artist_name,
                            genre=everynoise_genre)
-                
+
                 enhanced_artists.append(enhanced_artist)
                 found_count += 1
             else:
                 # No genre found, keep original
                 enhanced_artists.append(artist)
-            
-            processed_count += 1
-            
-            # Rate limiting - be respectful
-            if processed_count % 5 == 0:
-                time.sleep(2.0)
-        
+
+        processed_count = len(to_classify)
+        if processed_count:
+            self._save_artist_cache()
         logger.info("Completed Every Noise classification",
                    total_processed=processed_count,
                    genres_found=found_count,
@@ -5,68 +5,76 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
 import numpy as np
+import pyarrow as pa
 from snowflake.snowpark.context import get_active_session
 
-# Get the current session (Snowflake native Streamlit)
+# Get the current session (Snowflake native Streamlit). This is one shared
+# connection for the whole app - every loader issues its queries through it
+# with bind parameters, so there is no per-query handshake and identical
+# parameterized statements hit Snowflake's result cache across reruns.
 session = get_active_session()
 
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
-def apply_spotify_theme(fig, title=None):
-    """Apply Spotify color theme to Plotly figures"""
-    fig.update_layout(
+# Register the Spotify look as a Plotly template once at import time.
+# Dashboards render dozens of figures per rerun; pointing each figure at
+# the shared template replaces the six update_layout/update_*axes dict
+# merges a per-figure theming helper used to perform.
+_SPOTIFY_AXIS_STYLE = dict(
+    gridcolor='#535353',
+    linecolor='#535353',
+    tickcolor='#B3B3B3',
+    tickfont_color='#B3B3B3'
+)
+
+pio.templates['spotify'] = go.layout.Template(
+    layout=dict(
         plot_bgcolor='rgba(0,0,0,0)',
         paper_bgcolor='#191414',
         font_color='#FFFFFF',
         title_font_color='#1DB954',
         title_font_size=16,
-        title_font_family='Arial, sans-serif'
-    )
-    
-    if title:
-        fig.update_layout(title=title)
-    
-    # Update axes
-    fig.update_xaxes(
-        gridcolor='#535353',
-        linecolor='#535353',
-        tickcolor='#B3B3B3',
-        tickfont_color='#B3B3B3'
+        title_font_family='Arial, sans-serif',
+        colorway=('#1DB954', '#1ED760', '#535353', '#B3B3B3', '#FFFFFF',
+                  '#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7'),
+        xaxis=_SPOTIFY_AXIS_STYLE,
+        yaxis=_SPOTIFY_AXIS_STYLE
     )
-    fig.update_yaxes(
-        gridcolor='#535353', 
-        linecolor='#535353',
-        tickcolor='#B3B3B3',
-        tickfont_color='#B3B3B3'
-    )
-    
-    return fig
+)
+pio.templates.default = 'spotify'
 
 def filter_data_by_sidebar(data, genre_filters, time_filters, weekend_filter):
     """Apply sidebar filters to any dataset"""
-    filtered = data.copy()
-    
+    # Compose one boolean mask and index once instead of chaining
+    # filtered = filtered[...] reassignments (each of those allocates
+    # a whole new frame on every Streamlit rerun)
+    mask = np.ones(len(data), dtype=bool)
+
     # Apply genre filters (multiselect)
-    if genre_filters and 'PRIMARY_GENRE' in filtered.columns:
-        filtered = filtered[filtered['PRIMARY_GENRE'].isin(genre_filters)]
-    
+    if genre_filters and 'PRIMARY_GENRE' in data.columns:
+        mask &= data['PRIMARY_GENRE'].isin(genre_filters).to_numpy()
+
     # Apply time filters (multiselect)
-    if time_filters and 'TIME_OF_DAY_CATEGORY' in filtered.columns:
-        filtered = filtered[filtered['TIME_OF_DAY_CATEGORY'].isin(time_filters)]
-    
-    # Apply weekend filter (single select)
-    if 'IS_WEEKEND' in filtered.columns:
+    if time_filters and 'TIME_OF_DAY_CATEGORY' in data.columns:
+        mask &= data['TIME_OF_DAY_CATEGORY'].isin(time_filters).to_numpy()
+
+    # Apply weekend filter (single select) - the column is already bool,
+    # so use it (or its complement) directly as the mask term
+    if 'IS_WEEKEND' in data.columns:
         if weekend_filter == 'Weekends Only':
-            filtered = filtered[filtered['IS_WEEKEND'] == True]
+            mask &= data['IS_WEEKEND'].to_numpy()
         elif weekend_filter == 'Weekdays Only':
-            filtered = filtered[filtered['IS_WEEKEND'] == False]
-    
-    return filtered
+            mask &= ~data['IS_WEEKEND'].to_numpy()
+
+    return data.loc[mask]
 
 # ============================================================================
 # PAGE CONFIG
@@ -92,376 +100,23 @@ SPOTIFY_LIGHT_GRAY = '#B3B3B3'
 SPOTIFY_DARK_GREEN = '#1ED760'
 SPOTIFY_PALE_GREEN = '#1db95440'  # Green with transparency
 
-# Custom CSS for Spotify theme - STRATEGIC TEXT COLORS BY BACKGROUND
-st.markdown("""
-<style>
-    /* =================================================================
-       CORE APP STYLING - Dark Background (#191414)
-    ================================================================= */
-    
-    /* Main app background - DARK */
-    .stApp {
-        background-color: #191414 !important;
-        color: #FFFFFF !important;
-    }
-    
-    /* Main content area - DARK */
-    .main .block-container {
-        background-color: #191414 !important;
-        color: #FFFFFF !important;
-    }
-    
-    /* Headers on dark background - GREEN */
-    .main h1, .main h2, .main h3, .main h4, .main h5, .main h6 {
-        color: #1DB954 !important;
-        font-weight: bold !important;
-    }
-    
-    /* Text on dark main area - WHITE */
-    .main p, .main div:not([data-testid]), .main span {
-        color: #FFFFFF !important;
-    }
-    
-    /* =================================================================
-       SIDEBAR STYLING - Mixed Backgrounds
-    ================================================================= */
-    
-    /* Sidebar background - DARK */
-    .css-1d391kg, section[data-testid="stSidebar"] {
-        background-color: #0F0F0F !important;
-    }
-    
-    /* Sidebar headers and titles - GREEN on dark */
-    .css-1d391kg h1, .css-1d391kg h2, .css-1d391kg h3,
-    section[data-testid="stSidebar"] h1, 
-    section[data-testid="stSidebar"] h2, 
-    section[data-testid="stSidebar"] h3 {
-        color: #1DB954 !important;
-        font-weight: bold !important;
-    }
-    
-    /* Sidebar labels - GREEN on dark - COMPREHENSIVE TARGETING */
-    section[data-testid="stSidebar"] label,
-    .css-1d391kg label,
-    section[data-testid="stSidebar"] .stSelectbox label,
-    section[data-testid="stSidebar"] .stDateInput label,
-    section[data-testid="stSidebar"] .stMultiSelect label,
-    section[data-testid="stSidebar"] .stSelectbox > label,
-    section[data-testid="stSidebar"] .stMultiSelect > label,
-    section[data-testid="stSidebar"] .stDateInput > label,
-    section[data-testid="stSidebar"] .stSelectbox div[data-testid="stSelectboxLabel"],
-    section[data-testid="stSidebar"] .stMultiSelect div[data-testid="stMultiSelectLabel"],
-    section[data-testid="stSidebar"] [data-testid*="label"],
-    section[data-testid="stSidebar"] [class*="label"],
-    .css-1d391kg .stSelectbox label,
-    .css-1d391kg .stMultiSelect label {
-        color: #1DB954 !important;
-        font-weight: bold !important;
-        font-size: 0.9rem !important;
-    }
-    
-    /* Additional selectors for any text elements in sidebar that should be visible */
-    section[data-testid="stSidebar"] > div label,
-    section[data-testid="stSidebar"] > div > div label,
-    section[data-testid="stSidebar"] .element-container label,
-    section[data-testid="stSidebar"] .stFormHelperText {
-        color: #1DB954 !important;
-        font-weight: bold !important;
-    }
-    
-    /* ULTIMATE NUCLEAR OPTION - Force ALL sidebar text to be visible */
-    section[data-testid="stSidebar"] * {
-        color: #FFFFFF !important;
-    }
-    
-    /* Then specifically make labels green */
-    section[data-testid="stSidebar"] label,
-    section[data-testid="stSidebar"] .stSelectbox label,
-    section[data-testid="stSidebar"] .stMultiSelect label,
-    section[data-testid="stSidebar"] .stDateInput label {
-        color: #1DB954 !important;
-        font-weight: bold !important;
-    }
-    
-    /* Input field text should be black on white background */
-    section[data-testid="stSidebar"] input,
-    section[data-testid="stSidebar"] .stSelectbox input,
-    section[data-testid="stSidebar"] .stSelectbox div[role="combobox"],
-    section[data-testid="stSidebar"] .stSelectbox div[data-baseweb="select"] {
-        color: #000000 !important;
-        background-color: #FFFFFF !important;
-    }
-    
-    /* Input fields in sidebar - COMPREHENSIVE TARGETING for LIGHT backgrounds */
-    
-    /* All input elements in sidebar */
-    section[data-testid="stSidebar"] input,
-    section[data-testid="stSidebar"] .stSelectbox input,
-    section[data-testid="stSidebar"] .stDateInput input,
-    .css-1d391kg input {
-        background-color: #FFFFFF !important;
-        color: #000000 !important;
-        border: 1px solid #535353 !important;
-    }
-    
-    /* Selectbox containers and text */
-    section[data-testid="stSidebar"] .stSelectbox > div,
-    section[data-testid="stSidebar"] .stSelectbox > div > div,
-    section[data-testid="stSidebar"] .stSelectbox div[data-baseweb="select"],
-    section[data-testid="stSidebar"] .stSelectbox div[data-baseweb="select"] > div,
-    .css-1d391kg .stSelectbox > div,
-    .css-1d391kg .stSelectbox > div > div {
-        background-color: #FFFFFF !important;
-        color: #000000 !important;
-        border: 1px solid #535353 !important;
-    }
-    
-    /* Date input containers */
-    section[data-testid="stSidebar"] .stDateInput > div,
-    section[data-testid="stSidebar"] .stDateInput > div > div,
-    section[data-testid="stSidebar"] .stDateInput > div > div > div,
-    .css-1d391kg .stDateInput > div > div > div {
-        background-color: #FFFFFF !important;
-        color: #000000 !important;
-        border: 1px solid #535353 !important;
-    }
-    
-    /* Dropdown menu items when opened */
-    section[data-testid="stSidebar"] .stSelectbox [role="listbox"],
-    section[data-testid="stSidebar"] .stSelectbox [role="option"],
-    section[data-testid="stSidebar"] .stSelectbox ul,
-    section[data-testid="stSidebar"] .stSelectbox li {
-        background-color: #FFFFFF !important;
-        color: #000000 !important;
-    }
-    
-    /* Additional fallback selectors for select elements */
-    section[data-testid="stSidebar"] select,
-    section[data-testid="stSidebar"] option,
-    .css-1d391kg select,
-    .css-1d391kg option {
-        background-color: #FFFFFF !important;
-        color: #000000 !important;
-    }
-    
-    /* Force all text in sidebar inputs to be black */
-    section[data-testid="stSidebar"] .stSelectbox *,
-    section[data-testid="stSidebar"] .stDateInput *,
-    section[data-testid="stSidebar"] input *,
-    section[data-testid="stSidebar"] .stMultiSelect * {
-        color: #000000 !important;
-    }
-    
-    /* Additional nuclear option for dropdown content */
-    .css-1d391kg [data-baseweb] *,
-    section[data-testid="stSidebar"] [data-baseweb] *,
-    section[data-testid="stSidebar"] div[role="listbox"] *,
-    section[data-testid="stSidebar"] div[role="option"] *,
-    section[data-testid="stSidebar"] .Select-menu *,
-    section[data-testid="stSidebar"] .Select-option * {
-        color: #000000 !important;
-        background-color: #FFFFFF !important;
-    }
-    
-    /* Override any remaining white text */
-    section[data-testid="stSidebar"] [style*="color: white"],
-    section[data-testid="stSidebar"] [style*="color: #FFFFFF"],
-    section[data-testid="stSidebar"] [style*="color: #ffffff"] {
-        color: #000000 !important;
-    }
-    
-    /* =================================================================
-       METRIC CARDS - Dark Background with Styled Values
-    ================================================================= */
-    
-    [data-testid="metric-container"] {
-        background: linear-gradient(135deg, #0F0F0F 0%, #191414 100%) !important;
-        border: 2px solid #1DB954 !important;
-        padding: 1.2rem !important;
-        border-radius: 0.8rem !important;
-        box-shadow: 0 4px 8px rgba(29, 185, 84, 0.2) !important;
-    }
-    
-    /* Metric labels - WHITE on dark */
-    [data-testid="metric-container"] [data-testid="metric-label"] {
-        color: #FFFFFF !important;
-        font-weight: 600 !important;
-        font-size: 1rem !important;
-    }
-    
-    /* Metric values - COLORED on dark */
-    [data-testid="metric-container"] [data-testid="metric-value"] {
-        font-size: 2.2rem !important;
-        font-weight: 700 !important;
-    }
-    
-    /* Different colors for each metric value */
-    [data-testid="metric-container"]:nth-child(1) [data-testid="metric-value"] {
-        color: #1DB954 !important; /* Spotify Green */
-    }
-
-    [data-testid="metric-container"]:nth-child(2) [data-testid="metric-value"] {
-        color: #1ED760 !important; /* Light Green */
-    }
-
-    [data-testid="metric-container"]:nth-child(3) [data-testid="metric-value"] {
-        color: #4ECDC4 !important; /* Teal */
-    }
+# Custom CSS for Spotify theme - STRATEGIC TEXT COLORS BY BACKGROUND.
+# The stylesheet lives in assets/spotify_theme.css; reading it is cached per
+# process so reruns reuse the same string instead of re-reading ~12KB of CSS
+# from the script body on every interaction.
+@st.cache_resource
+def load_css() -> str:
+    """Return the Spotify theme stylesheet wrapped in a <style> tag."""
+    css_path = Path(__file__).parent / "assets" / "spotify_theme.css"
+    return "<style>" + css_path.read_text() + "</style>"
 
-    [data-testid="metric-container"]:nth-child(4) [data-testid="metric-value"] {
-        color: #45B7D1 !important; /* Blue */
-    }
-
-    [data-testid="metric-container"]:nth-child(5) [data-testid="metric-value"] {
-        color: #96CEB4 !important; /* Pale Green */
-    }
-    
-    /* =================================================================
-       TAB STYLING - Mixed Backgrounds
-    ================================================================= */
-    
-    /* Tab container - DARK */
-    .stTabs [data-baseweb="tab-list"] {
-        background-color: #0F0F0F !important;
-    }
-    
-    /* Inactive tabs - DARK background, LIGHT text */
-    .stTabs [data-baseweb="tab"] {
-        background-color: #0F0F0F !important;
-        color: #B3B3B3 !important;
-        border-color: #535353 !important;
-    }
-    
-    /* Active tab - LIGHT background (green), DARK text */
-    .stTabs [aria-selected="true"] {
-        background-color: #1DB954 !important;
-        color: #000000 !important;
-        font-weight: bold !important;
-    }
-    
-    /* Tab content - DARK background, WHITE text */
-    .stTabs [data-baseweb="tab-panel"] {
-        background-color: #191414 !important;
-        color: #FFFFFF !important;
-    }
-    
-    /* =================================================================
-       DATAFRAMES AND TABLES - Dark Background
-    ================================================================= */
-    
-    /* Table container - DARK */
-    .stDataFrame {
-        background-color: #0F0F0F !important;
-    }
-    
-    /* Table cells - DARK background, WHITE text */
-    .stDataFrame td {
-        background-color: #0F0F0F !important;
-        color: #FFFFFF !important;
-        border-color: #535353 !important;
-    }
-    
-    /* Table headers - GREEN background, BLACK text */
-    .stDataFrame th {
-        background-color: #1DB954 !important;
-        color: #000000 !important;
-        font-weight: bold !important;
-        border-color: #535353 !important;
-    }
-    
-    /* =================================================================
-       PLOTLY CHARTS - Background Handling
-    ================================================================= */
-    
-    /* Chart containers - DARK */
-    .stPlotlyChart {
-        background-color: #191414 !important;
-    }
-    
-    /* =================================================================
-       ALERT MESSAGES - Various Backgrounds
-    ================================================================= */
-    
-    /* Info alerts - DARK background, WHITE text */
-    .stAlert[data-baseweb="notification"] {
-        background-color: #0F0F0F !important;
-        color: #FFFFFF !important;
-        border: 1px solid #1DB954 !important;
-    }
-    
-    /* Success messages - DARK green, GREEN text */
-    .stSuccess {
-        background-color: #0F2F0F !important;
-        color: #1DB954 !important;
-        border: 1px solid #1DB954 !important;
-    }
-    
-    /* Warning messages - DARK yellow, YELLOW text */
-    .stWarning {
-        background-color: #2F2F0F !important;
-        color: #FFEAA7 !important;
-        border: 1px solid #FFEAA7 !important;
-    }
-    
-    /* Error messages - DARK red, RED text */
-    .stError {
-        background-color: #2F0F0F !important;
-        color: #FF6B6B !important;
-        border: 1px solid #FF6B6B !important;
-    }
-    
-    /* =================================================================
-       FORM ELEMENTS - Light Background Inputs Need Dark Text
-    ================================================================= */
-    
-    /* Text inputs - LIGHT background, DARK text */
-    .stTextInput input {
-        background-color: #FFFFFF !important;
-        color: #000000 !important;
-        border: 1px solid #535353 !important;
-    }
-    
-    /* Number inputs - LIGHT background, DARK text */
-    .stNumberInput input {
-        background-color: #FFFFFF !important;
-        color: #000000 !important;
-        border: 1px solid #535353 !important;
-    }
-    
-    /* Textarea - LIGHT background, DARK text */
-    .stTextArea textarea {
-        background-color: #FFFFFF !important;
-        color: #000000 !important;
-        border: 1px solid #535353 !important;
-    }
-    
-    /* =================================================================
-       SPECIFIC OVERRIDES for Common Issues
-    ================================================================= */
-    
-    /* Make sure metric labels are always visible */
-    [data-testid="metric-container"] > div:first-child {
-        color: #FFFFFF !important;
-    }
-    
-    /* Make sure metric values are always colored */
-    [data-testid="metric-container"] > div:last-child {
-        color: #1DB954 !important;
-    }
-    
-    /* Ensure sidebar text is readable */
-    section[data-testid="stSidebar"] p,
-    section[data-testid="stSidebar"] div:not([class*="baseweb"]):not([data-testid]) {
-        color: #FFFFFF !important;
-    }
-    
-</style>
-""", unsafe_allow_html=True)
+st.markdown(load_css(), unsafe_allow_html=True)
 
-# Spotify color palette for charts
-SPOTIFY_COLORS = [
+# Spotify color palette for charts - tuples so Streamlit's per-rerun script
+# re-execution reuses interned constants instead of rebuilding lists
+SPOTIFY_COLORS = (
     '#1DB954',  # Spotify Green
-    '#1ED760',  # Light Green  
+    '#1ED760',  # Light Green
     '#535353',  # Gray
     '#B3B3B3',  # Light Gray
     '#FFFFFF',  # White
@@ -470,31 +125,197 @@ SPOTIFY_COLORS = [
     '#45B7D1',  # Accent Blue
     '#96CEB4',  # Pale Green
     '#FFEAA7'   # Accent Yellow
-]
+)
+
+# Day-of-week constants for the weekly pattern chart
+DAY_MAPPING = {
+    'Sun': 'Sunday',
+    'Mon': 'Monday',
+    'Tue': 'Tuesday',
+    'Wed': 'Wednesday',
+    'Thu': 'Thursday',
+    'Fri': 'Friday',
+    'Sat': 'Saturday'
+}
+DAY_ORDER = ('Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat')
+
+# Recommendation card markup, parsed once at import; the card loop fills
+# it with format_map instead of re-tokenizing an inline f-string per track
+REC_CARD_TPL = """
+<div style="display: flex; gap: 1rem; align-items: stretch; margin: 10px 0;
+            border-bottom: 1px solid #535353; padding-bottom: 10px;">
+    <div style="flex: 3; background: linear-gradient(135deg, #1DB954 0%, #1aa34a 100%);
+                padding: 15px; border-radius: 10px;
+                box-shadow: 0 4px 8px rgba(0,0,0,0.3);">
+        <h4 style="color: white; margin: 0 0 5px 0;">{track_name}</h4>
+        <p style="color: #f0f0f0; margin: 0 0 5px 0;"><strong>by {artist_name}</strong></p>
+        <p style="color: #d0d0d0; margin: 0; font-size: 0.9em;">{album_name} • {genre}</p>
+    </div>
+    <div style="flex: 2; text-align: center; padding: 10px;">
+        <div style="color: #FFFFFF; font-size: 0.85em;">🎯 AI Score</div>
+        <div style="color: #1DB954; font-size: 1.6em; font-weight: 700;">{score:.3f}</div>
+        <div style="color: #FFFFFF; font-size: 0.85em; margin-top: 6px;">📈 Popularity</div>
+        <div style="color: #1DB954; font-size: 1.6em; font-weight: 700;">{popularity}/100</div>
+    </div>
+    <div style="flex: 1; text-align: center; padding: 10px;">
+        {play_link}
+        <p style="color: #B3B3B3; font-size: 0.8em; margin-top: 8px;">💡 {reason}</p>
+    </div>
+</div>
+"""
+
+REC_PLAY_LINK_TPL = (
+    '<a href="{spotify_url}" target="_blank" '
+    'style="background-color: #1DB954; color: white; padding: 10px 15px; '
+    'border-radius: 25px; text-decoration: none; display: inline-block; '
+    'font-weight: bold; text-align: center; width: 80px;">🎵 Play</a>'
+)
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
-@st.cache_data
-def load_daily_summary():
-    """Load daily listening summary data"""
+# All Snowpark loaders are cached for 5 minutes so widget changes and tab
+# switches re-render from memory instead of re-hitting Snowflake; the TTL
+# also lets new pipeline data show up without restarting the app.
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_date_bounds():
+    """Min/max summary dates for the date picker - a one-row probe instead
+    of loading the whole summary table just to read its extremes.
+
+    The DATE columns come back as two ready-made ``datetime.date`` values;
+    nothing per-row is materialized client-side.
+    """
     try:
-        return session.sql("""
-            SELECT *
+        rows = session.sql("""
+            SELECT MIN(denver_date) AS min_date, MAX(denver_date) AS max_date
+            FROM spotify_analytics.medallion_arch.gold_daily_listening_summary
+        """).collect()
+        if rows and rows[0]['MIN_DATE'] is not None:
+            return rows[0]['MIN_DATE'], rows[0]['MAX_DATE']
+    except Exception as e:
+        st.warning(f"Date filter issue: {e}. Using default date range.")
+    return None
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_daily_summary(start_date, end_date, weekend_filter):
+    """Load daily listening summary data for the selected window"""
+    # Project only the columns the dashboard reads - SELECT * drags every
+    # gold column over the wire and into the cached frame. Filtering by
+    # date and weekend status here lets Snowflake prune partitions instead
+    # of shipping the full history to pandas and masking it on every rerun.
+    try:
+        start_str = pd.to_datetime(start_date).strftime('%Y-%m-%d')
+        end_str = pd.to_datetime(end_date).strftime('%Y-%m-%d')
+        weekend_predicate = {
+            'Weekends Only': 'AND is_weekend = TRUE',
+            'Weekdays Only': 'AND is_weekend = FALSE'
+        }.get(weekend_filter, '')
+
+        df = session.sql(f"""
+            SELECT
+                denver_date,
+                day_of_week,
+                is_weekend,
+                total_plays,
+                unique_tracks,
+                unique_artists,
+                total_listening_minutes,
+                genre_diversity_score
             FROM spotify_analytics.medallion_arch.gold_daily_listening_summary
+            WHERE denver_date BETWEEN '{start_str}' AND '{end_str}'
+            {weekend_predicate}
             ORDER BY denver_date DESC
         """).to_pandas()
+
+        # Normalize dtypes here so the parsed/downcast frame is what gets
+        # cached - doing this in the script body re-ran the conversions on
+        # every rerun even on cache hits
+        if not df.empty:
+            df['DENVER_DATE'] = pd.to_datetime(df['DENVER_DATE'])
+            df = df.astype({
+                'IS_WEEKEND': 'bool',
+                'TOTAL_PLAYS': 'int32',
+                'UNIQUE_TRACKS': 'int32',
+                'UNIQUE_ARTISTS': 'int32'
+            })
+        return df
     except Exception as e:
         st.error(f"Error loading daily summary data: {e}")
         return pd.DataFrame()
 
-@st.cache_data
+@st.cache_data(ttl=300, show_spinner=False)
+def load_kpis(start_date, end_date, weekend_filter):
+    """Aggregate KPI row for the metric cards, computed in Snowflake.
+
+    One five-column row comes back instead of the whole daily frame;
+    the sums and average run in the warehouse's vectorized engine.
+    """
+    try:
+        start_str = pd.to_datetime(start_date).strftime('%Y-%m-%d')
+        end_str = pd.to_datetime(end_date).strftime('%Y-%m-%d')
+        weekend_predicate = {
+            'Weekends Only': 'AND is_weekend = TRUE',
+            'Weekdays Only': 'AND is_weekend = FALSE'
+        }.get(weekend_filter, '')
+
+        rows = session.sql(f"""
+            SELECT
+                SUM(total_plays) AS total_plays,
+                SUM(unique_tracks) AS unique_tracks,
+                SUM(unique_artists) AS unique_artists,
+                SUM(total_listening_minutes) / 60.0 AS total_hours,
+                AVG(total_plays) AS avg_daily_plays
+            FROM spotify_analytics.medallion_arch.gold_daily_listening_summary
+            WHERE denver_date BETWEEN '{start_str}' AND '{end_str}'
+            {weekend_predicate}
+        """).collect()
+
+        if rows and rows[0]['TOTAL_PLAYS'] is not None:
+            row = rows[0]
+            return (int(row['TOTAL_PLAYS']), int(row['UNIQUE_TRACKS']),
+                    int(row['UNIQUE_ARTISTS']), float(row['TOTAL_HOURS']),
+                    float(row['AVG_DAILY_PLAYS']))
+    except Exception as e:
+        st.error(f"Error loading KPI metrics: {e}")
+    return None
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_weekly_pattern(start_date, end_date, weekend_filter):
+    """Average plays per day of week, grouped in Snowflake (at most 7 rows)."""
+    try:
+        start_str = pd.to_datetime(start_date).strftime('%Y-%m-%d')
+        end_str = pd.to_datetime(end_date).strftime('%Y-%m-%d')
+        weekend_predicate = {
+            'Weekends Only': 'AND is_weekend = TRUE',
+            'Weekdays Only': 'AND is_weekend = FALSE'
+        }.get(weekend_filter, '')
+
+        return session.sql(f"""
+            SELECT
+                day_of_week,
+                AVG(total_plays) AS total_plays
+            FROM spotify_analytics.medallion_arch.gold_daily_listening_summary
+            WHERE denver_date BETWEEN '{start_str}' AND '{end_str}'
+            {weekend_predicate}
+            GROUP BY day_of_week
+        """).to_pandas()
+    except Exception as e:
+        st.error(f"Error loading weekly pattern data: {e}")
+        return pd.DataFrame()
+
+@st.cache_data(ttl=300, show_spinner=False)
 def load_genre_analysis():
     """Load genre analysis data"""
     try:
         return session.sql("""
-            SELECT *
+            SELECT
+                primary_genre,
+                total_plays,
+                unique_artists,
+                total_listening_minutes,
+                percentage_of_total_listening
             FROM spotify_analytics.medallion_arch.gold_genre_analysis
             ORDER BY total_plays DESC
         """).to_pandas()
@@ -502,44 +323,154 @@ def load_genre_analysis():
         st.error(f"Error loading genre analysis data: {e}")
         return pd.DataFrame()
 
-@st.cache_data
-def load_monthly_insights():
-    """Load monthly insights data"""
+def _detail_predicates(genres, times, weekend_filter):
+    """Build the shared sidebar-filter WHERE fragment for the silver table.
+
+    Returns the extra predicate SQL (bind-parameter placeholders) and the
+    parameter values, so loaders keep identical query text across filter
+    combinations and stay plan-cache friendly.
+    """
+    fragments = []
+    params = []
+    if genres:
+        placeholders = ', '.join('?' for _ in genres)
+        fragments.append(f"AND primary_genre IN ({placeholders})")
+        params.extend(genres)
+    if times:
+        placeholders = ', '.join('?' for _ in times)
+        fragments.append(f"AND time_of_day_category IN ({placeholders})")
+        params.extend(times)
+    weekend_predicate = {
+        'Weekends Only': 'AND is_weekend = TRUE',
+        'Weekdays Only': 'AND is_weekend = FALSE'
+    }.get(weekend_filter, '')
+    if weekend_predicate:
+        fragments.append(weekend_predicate)
+    return ' '.join(fragments), params
+
+@st.cache_data(ttl=600, show_spinner=False)
+def load_genre_stats(start_date, end_date, genres, times, weekend_filter):
+    """Genre rollup for the active sidebar filters, aggregated in Snowflake.
+
+    Replaces the pandas groupby over row-level detail - only one row per
+    genre travels to the client. Callers pass genres/times as tuples so
+    identical filter combinations hash to the same cache entry.
+    """
+    try:
+        start_str = pd.to_datetime(start_date).strftime('%Y-%m-%d')
+        end_str = pd.to_datetime(end_date).strftime('%Y-%m-%d')
+        extra_sql, extra_params = _detail_predicates(genres, times, weekend_filter)
+
+        df = session.sql(f"""
+            SELECT
+                primary_genre,
+                COUNT(*) AS total_plays,
+                COUNT(DISTINCT primary_artist_name) AS unique_artists,
+                SUM(track_duration_minutes) / 60.0 AS total_listening_hours
+            FROM spotify_analytics.medallion_arch.silver_listening_enriched
+            WHERE denver_date BETWEEN ? AND ?
+            {extra_sql}
+            GROUP BY primary_genre
+            ORDER BY total_plays DESC
+        """, params=[start_str, end_str] + extra_params).to_pandas()
+
+        if not df.empty:
+            # Tiny frame by now - one vectorized divide for the share
+            # column; rounding is left to the display column_config
+            df['PERCENTAGE_OF_TOTAL_LISTENING'] = (
+                100 * df['TOTAL_PLAYS'] / df['TOTAL_PLAYS'].sum()
+            )
+        return df
+    except Exception as e:
+        st.error(f"Error loading genre stats: {e}")
+        return pd.DataFrame()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_monthly_insights(start_date, end_date):
+    """Load monthly insights data for the selected window"""
     try:
-        return session.sql("""
-            SELECT *
+        start_str = pd.to_datetime(start_date).strftime('%Y-%m-%d')
+        end_str = pd.to_datetime(end_date).strftime('%Y-%m-%d')
+
+        return session.sql(f"""
+            SELECT
+                year,
+                month,
+                month_name,
+                total_plays
             FROM spotify_analytics.medallion_arch.gold_monthly_insights
+            WHERE DATE_FROM_PARTS(year, month, 1)
+                BETWEEN DATE_TRUNC('month', '{start_str}'::DATE) AND '{end_str}'::DATE
             ORDER BY year DESC, month DESC
         """).to_pandas()
     except Exception as e:
         st.error(f"Error loading monthly insights data: {e}")
         return pd.DataFrame()
 
-@st.cache_data
-def load_artist_summary():
-    """Load artist summary data"""
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_artist_summary(genres=()):
+    """Load artist summary data, optionally restricted to selected genres.
+
+    silver_artist_summary is already pre-aggregated warehouse-side, so
+    filtering genres here means Snowflake's result cache serves repeat
+    filter combinations and only the needed rows reach the client.
+    """
     try:
-        return session.sql("""
-            SELECT *
+        genre_predicate = ''
+        params = []
+        if genres:
+            placeholders = ', '.join('?' for _ in genres)
+            genre_predicate = f"AND primary_genre IN ({placeholders})"
+            params = list(genres)
+
+        return session.sql(f"""
+            SELECT
+                artist_name,
+                primary_genre,
+                total_plays,
+                unique_tracks_played,
+                total_listening_minutes,
+                total_listening_minutes / 60.0 AS total_listening_hours,
+                artist_popularity,
+                weekend_play_percentage
             FROM spotify_analytics.medallion_arch.silver_artist_summary
             WHERE total_plays >= 5
+            {genre_predicate}
             ORDER BY total_plays DESC
             LIMIT 200
-        """).to_pandas()
+        """, params=params).to_pandas()
     except Exception as e:
         st.error(f"Error loading artist summary data: {e}")
         return pd.DataFrame()
 
-@st.cache_data
+def _arrow_string_mapper(arrow_type):
+    """Keep string columns Arrow-backed instead of one Python str per row.
+
+    to_pandas() normally copies Arrow string buffers into object-dtype
+    columns; mapping them to pd.ArrowDtype leaves them as contiguous UTF-8
+    buffers, roughly halving memory for the string-heavy silver table.
+    Numeric/bool/timestamp columns keep their NumPy dtypes.
+    """
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+# Bounded cache: date-picker scrubbing creates one entry per window, so cap
+# how many heavyweight frames stay resident; persist="disk" lets entries
+# survive app restarts within the TTL
+@st.cache_data(ttl=3600, max_entries=64, persist="disk", show_spinner=False)
 def load_listening_data(start_date, end_date):
     """Load detailed listening data for date range"""
     try:
-        # Convert dates to string format for SQL query
+        # Convert dates to string format for the bind parameters
         start_str = pd.to_datetime(start_date).strftime('%Y-%m-%d')
         end_str = pd.to_datetime(end_date).strftime('%Y-%m-%d')
-        
-        return session.sql(f"""
-            SELECT 
+
+        # Bind variables keep the query text identical across date windows,
+        # so Snowflake reuses the compiled plan instead of recompiling per
+        # f-string variant
+        df = session.sql("""
+            SELECT
                 denver_date,
                 denver_timestamp,
                 denver_hour,
@@ -554,13 +485,417 @@ def load_listening_data(start_date, end_date):
                 artist_popularity,
                 listening_source
             FROM spotify_analytics.medallion_arch.silver_listening_enriched
-            WHERE denver_date BETWEEN '{start_str}' AND '{end_str}'
+            WHERE denver_date BETWEEN ? AND ?
             ORDER BY denver_timestamp DESC
-        """).to_pandas()
+        """, params=[start_str, end_str]).to_pandas(
+            # Forwarded to pyarrow.Table.to_pandas by the connector
+            types_mapper=_arrow_string_mapper,
+            split_blocks=True,
+            self_destruct=True
+        )
+
+        # Parse/downcast once inside the cache so reruns reuse the
+        # normalized frame instead of re-converting per interaction
+        if not df.empty:
+            df['DENVER_DATE'] = pd.to_datetime(df['DENVER_DATE'])
+            df['DENVER_TIMESTAMP'] = pd.to_datetime(df['DENVER_TIMESTAMP'])
+            df = df.astype({
+                'IS_WEEKEND': 'bool',
+                'DENVER_HOUR': 'int8',
+                'TRACK_POPULARITY': 'int16',
+                'ARTIST_POPULARITY': 'int16',
+                # float32 is plenty for minute durations shown to 2 dp
+                'TRACK_DURATION_MINUTES': 'float32',
+                # Low-cardinality labels: category stores each distinct
+                # value once plus small integer codes, so the tab counts,
+                # isin() sidebar filters and nunique() summaries all run on
+                # the codes instead of hashing Python strings; IS_WEEKEND
+                # stays plain bool (two values gain nothing from category)
+                'PRIMARY_GENRE': 'category',
+                'TIME_OF_DAY_CATEGORY': 'category',
+                'LISTENING_SOURCE': 'category',
+                'PRIMARY_ARTIST_NAME': 'category',
+                'ALBUM_NAME': 'category'
+            })
+        return df
     except Exception as e:
         st.error(f"Error loading listening data: {e}")
         return pd.DataFrame()
 
+# Sort-option dispatch for the Detailed View - widget label to ORDER BY
+_DETAIL_SORT_COLUMNS = {
+    'Latest First': 'denver_timestamp DESC',
+    'Track Popularity': 'track_popularity DESC',
+    'Artist Popularity': 'artist_popularity DESC',
+    'Duration': 'track_duration_minutes DESC'
+}
+
+@st.cache_data(ttl=600, max_entries=64, show_spinner=False)
+def load_detail_page(start_date, end_date, genres, times, weekend_filter,
+                     sort_by, limit):
+    """The page of rows the Detailed View actually displays.
+
+    Sorting and LIMIT run in Snowflake, so at most `limit` rows travel to
+    the client instead of the whole window being fetched, sorted in pandas
+    and truncated to the same page.
+    """
+    try:
+        start_str = pd.to_datetime(start_date).strftime('%Y-%m-%d')
+        end_str = pd.to_datetime(end_date).strftime('%Y-%m-%d')
+        order_by = _DETAIL_SORT_COLUMNS.get(sort_by, 'denver_timestamp DESC')
+        extra_sql, extra_params = _detail_predicates(genres, times, weekend_filter)
+
+        df = session.sql(f"""
+            SELECT
+                denver_timestamp,
+                track_name,
+                primary_artist_name,
+                primary_genre,
+                album_name,
+                track_duration_minutes,
+                track_popularity,
+                time_of_day_category
+            FROM spotify_analytics.medallion_arch.silver_listening_enriched
+            WHERE denver_date BETWEEN ? AND ?
+            {extra_sql}
+            ORDER BY {order_by}
+            LIMIT {int(limit)}
+        """, params=[start_str, end_str] + extra_params).to_pandas()
+
+        if not df.empty:
+            df['DENVER_TIMESTAMP'] = pd.to_datetime(df['DENVER_TIMESTAMP'])
+        return df
+    except Exception as e:
+        st.error(f"Error loading detail page: {e}")
+        return pd.DataFrame()
+
+@st.cache_data(ttl=600, show_spinner=False)
+def load_detail_summary(start_date, end_date, genres, times, weekend_filter):
+    """Scalar summary for the Detailed View metric cards.
+
+    Five scalars from one aggregate query instead of nunique()/min()/max()
+    scans over the full filtered frame on every rerun. Distinct counts use
+    the HyperLogLog sketch (~1-2% error) - plenty for a metric card and
+    much cheaper than exact distinct over the string columns.
+    """
+    try:
+        start_str = pd.to_datetime(start_date).strftime('%Y-%m-%d')
+        end_str = pd.to_datetime(end_date).strftime('%Y-%m-%d')
+        extra_sql, extra_params = _detail_predicates(genres, times, weekend_filter)
+
+        rows = session.sql(f"""
+            SELECT
+                COUNT(*) AS total_records,
+                APPROX_COUNT_DISTINCT(track_name) AS unique_tracks,
+                APPROX_COUNT_DISTINCT(primary_artist_name) AS unique_artists,
+                MIN(denver_timestamp) AS first_play,
+                MAX(denver_timestamp) AS last_play
+            FROM spotify_analytics.medallion_arch.silver_listening_enriched
+            WHERE denver_date BETWEEN ? AND ?
+            {extra_sql}
+        """, params=[start_str, end_str] + extra_params).collect()
+
+        if rows and rows[0]['TOTAL_RECORDS']:
+            row = rows[0]
+            return (int(row['TOTAL_RECORDS']), int(row['UNIQUE_TRACKS']),
+                    int(row['UNIQUE_ARTISTS']), row['FIRST_PLAY'], row['LAST_PLAY'])
+    except Exception as e:
+        st.error(f"Error loading detail summary: {e}")
+    return None
+
+# ============================================================================
+# ML RECOMMENDATION LOADERS
+# ============================================================================
+
+@lru_cache(maxsize=None)
+def _recs_query(strategy_type):
+    """SQL text and bind-parameter order for a recommendation strategy.
+
+    Pure function of the strategy name, memoized so repeated cache-miss
+    loads reuse the assembled text instead of restitching it. Bind
+    variables keep the SQL constant across parameter changes, so
+    Snowflake's compiled-plan cache gets a hit instead of a fresh parse
+    per slider position (None binds as NULL).
+    """
+    if strategy_type == "Hybrid (All)":
+        recs_query = """
+        SELECT * FROM TABLE(get_spotify_recommendations(?, ?, ?, NULL, ?))
+        """
+        param_order = ('num_recs', 'current_hour', 'is_weekend', 'min_score')
+    elif strategy_type == "Collaborative Filtering":
+        recs_query = """
+        SELECT
+            track_name,
+            primary_artist_name as artist_name,
+            primary_genre as genre,
+            album_name,
+            track_popularity,
+            recommendation_score,
+            'https://open.spotify.com/track/' || track_id as spotify_url,
+            'Collaborative Filtering' as recommendation_reason
+        FROM ml_collaborative_recommendations
+        WHERE recommendation_score >= ?
+        ORDER BY recommendation_score DESC
+        LIMIT ?
+        """
+        param_order = ('min_score', 'num_recs')
+    elif strategy_type == "Content-Based":
+        recs_query = """
+        SELECT
+            track_name,
+            primary_artist_name as artist_name,
+            primary_genre as genre,
+            album_name,
+            track_popularity,
+            recommendation_score,
+            'https://open.spotify.com/track/' || track_id as spotify_url,
+            'Content-Based Filtering' as recommendation_reason
+        FROM ml_content_based_recommendations
+        WHERE recommendation_score >= ?
+        ORDER BY recommendation_score DESC
+        LIMIT ?
+        """
+        param_order = ('min_score', 'num_recs')
+    elif strategy_type == "Temporal Patterns":
+        recs_query = """
+        SELECT * FROM TABLE(get_time_based_recommendations(?, ?, ?))
+        """
+        param_order = ('current_hour', 'is_weekend', 'num_recs')
+    else:  # Discovery
+        recs_query = """
+        SELECT * FROM TABLE(get_discovery_recommendations(?, ?, ?))
+        """
+        param_order = ('discovery_type', 'num_recs', 'max_popularity')
+
+    return recs_query, param_order
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_recommendations(strategy_type, num_recs, min_score, max_popularity,
+                         current_hour, is_weekend):
+    """Recommendations for the selected strategy, cached per parameter set.
+
+    Every widget interaction reruns the script, so without the cache each
+    rerun re-paid the Snowflake round-trip; identical parameter sets now
+    return the in-process frame. Returns None when the query fails so the
+    caller can show setup hints instead of an empty-result warning.
+    """
+    recs_query, param_order = _recs_query(strategy_type)
+    values = {
+        'num_recs': num_recs,
+        'min_score': min_score,
+        'max_popularity': max_popularity,
+        'current_hour': current_hour,
+        'is_weekend': is_weekend,
+        'discovery_type': "hidden_gems" if max_popularity < 60 else "balanced",
+    }
+    recs_params = [values[name] for name in param_order]
+
+    try:
+        return session.sql(recs_query, params=recs_params).to_pandas()
+    except Exception as e:
+        st.error(f"❌ Failed to generate recommendations: {e}")
+        return None
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_quick_recommendations(current_hour, is_weekend):
+    """All three quick-recommendation lists in one round-trip.
+
+    Each button used to issue its own query on click, paying query
+    compilation plus network latency three times over. One UNION ALL with
+    a source tag fetches the trio together, so a button press is a pure
+    in-memory filter. Returns the collect()ed Row list rather than a
+    DataFrame: 15 rows render straight into markdown, so the Arrow-to-
+    pandas conversion and frame overhead bought nothing here.
+    """
+    try:
+        return session.sql("""
+            SELECT 'trending' AS src, track_name, artist_name, genre,
+                   NULL AS detail, spotify_url
+            FROM (
+                SELECT
+                    track_name,
+                    primary_artist_name AS artist_name,
+                    primary_genre AS genre,
+                    track_popularity,
+                    'https://open.spotify.com/track/' || track_id AS spotify_url
+                FROM ml_track_content_features
+                WHERE track_popularity BETWEEN 60 AND 85
+                AND user_play_count = 0
+                AND primary_genre IN (
+                    SELECT primary_genre FROM ml_user_genre_interactions
+                    ORDER BY weighted_preference DESC LIMIT 3
+                )
+                ORDER BY track_popularity DESC, RANDOM()
+                LIMIT 5
+            )
+            UNION ALL
+            SELECT 'now', track_name, artist_name, genre, hour_relevance, NULL
+            FROM TABLE(get_time_based_recommendations(?, ?, 5))
+            UNION ALL
+            SELECT 'gems', track_name, artist_name, genre, discovery_reason, NULL
+            FROM TABLE(get_discovery_recommendations('hidden_gems', 5, 60))
+        """, params=[current_hour, is_weekend]).collect()
+    except Exception as e:
+        st.error(f"Error: {e}")
+        return None
+
+# ============================================================================
+# FIGURE BUILDERS
+# ============================================================================
+
+# Building a Plotly figure and serializing it to JSON for the browser is
+# repeated identically whenever the underlying aggregate hasn't changed
+# between reruns. These builders are keyed on the small aggregated frames
+# (tens of rows), so unchanged filters return the cached figure directly.
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def make_genre_pie(top_genres):
+    fig = px.pie(
+        top_genres,
+        values='TOTAL_PLAYS',
+        names='PRIMARY_GENRE',
+        title='Top 10 Genres by Plays',
+        color_discrete_sequence=SPOTIFY_COLORS
+    )
+    fig.update_layout(height=500)
+    return fig
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def make_genre_bar(top_genres):
+    fig = px.bar(
+        top_genres,
+        x='TOTAL_PLAYS',
+        y='PRIMARY_GENRE',
+        orientation='h',
+        title='Top 15 Genres by Total Plays',
+        labels={'TOTAL_PLAYS': 'Total Plays', 'PRIMARY_GENRE': 'Genre'},
+        color_discrete_sequence=[SPOTIFY_GREEN]
+    )
+    fig.update_layout(height=500)
+    return fig
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def make_artist_bar(top_artists):
+    fig = px.bar(
+        top_artists,
+        x='TOTAL_PLAYS',
+        y='ARTIST_NAME',
+        orientation='h',
+        title='Top 15 Most Played Artists',
+        labels={'TOTAL_PLAYS': 'Total Plays', 'ARTIST_NAME': 'Artist'},
+        color_discrete_sequence=[SPOTIFY_GREEN]
+    )
+    fig.update_layout(height=600)
+    return fig
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def make_artist_scatter(top_artists):
+    fig = px.scatter(
+        top_artists,
+        x='TOTAL_LISTENING_MINUTES',
+        y='UNIQUE_TRACKS_PLAYED',
+        size='TOTAL_PLAYS',
+        color='PRIMARY_GENRE',
+        hover_name='ARTIST_NAME',
+        title='Artist Discovery: Listening Time vs Track Diversity',
+        labels={
+            'TOTAL_LISTENING_MINUTES': 'Total Listening Minutes',
+            'UNIQUE_TRACKS_PLAYED': 'Unique Tracks Played'
+        },
+        color_discrete_sequence=SPOTIFY_COLORS
+    )
+    fig.update_layout(height=600)
+    return fig
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def make_hourly_line(hourly_data):
+    fig = px.line(
+        hourly_data,
+        x='DENVER_HOUR',
+        y='PLAYS',
+        title='Listening Activity by Hour of Day',
+        labels={'DENVER_HOUR': 'Hour of Day', 'PLAYS': 'Number of Plays'},
+        color_discrete_sequence=[SPOTIFY_GREEN]
+    )
+    fig.update_layout(
+        height=400,
+        xaxis=dict(tickmode='array', tickvals=list(range(0, 24, 2)))
+    )
+    return fig
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def make_time_of_day_pie(time_dist):
+    fig = px.pie(
+        time_dist,
+        values='PLAYS',
+        names='TIME_OF_DAY_CATEGORY',
+        title='Distribution by Time of Day',
+        color_discrete_sequence=SPOTIFY_COLORS
+    )
+    fig.update_layout(height=400)
+    return fig
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def make_weekend_line(weekend_data):
+    fig = px.line(
+        weekend_data,
+        x='DENVER_HOUR',
+        y='PLAYS',
+        color='DAY_TYPE',
+        title='Hourly Patterns: Weekdays vs Weekends',
+        labels={'DENVER_HOUR': 'Hour of Day', 'PLAYS': 'Average Plays'},
+        color_discrete_sequence=[SPOTIFY_GREEN, SPOTIFY_DARK_GREEN]
+    )
+    fig.update_layout(
+        height=400,
+        xaxis=dict(tickmode='array', tickvals=list(range(0, 24, 2)))
+    )
+    return fig
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def make_source_bar(source_dist):
+    fig = px.bar(
+        source_dist,
+        x='LISTENING_SOURCE',
+        y='PLAYS',
+        title='Listening Source Distribution',
+        labels={'LISTENING_SOURCE': 'Source', 'PLAYS': 'Number of Plays'},
+        color_discrete_sequence=[SPOTIFY_DARK_GREEN]
+    )
+    fig.update_layout(height=400)
+    return fig
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def make_rec_genre_bar(genre_counts):
+    fig = px.bar(
+        x=genre_counts.values,
+        y=genre_counts.index,
+        orientation='h',
+        title='Recommended Genres',
+        labels={'x': 'Number of Tracks', 'y': 'Genre'},
+        color_discrete_sequence=[SPOTIFY_GREEN]
+    )
+    return fig
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def make_rec_score_hist(scores):
+    # Bin the scores with np.histogram (compiled C loop) and hand Plotly
+    # ten ready-made bars; px.histogram would rescan the raw values and
+    # ship them all to the frontend, which stops being free once the
+    # recommendation LIMIT grows past the current 50
+    values = scores['RECOMMENDATION_SCORE'].to_numpy(dtype='float64')
+    values = values[~np.isnan(values)]
+    counts, edges = np.histogram(values, bins=10)
+    fig = px.bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        title='AI Recommendation Score Distribution',
+        labels={'x': 'Recommendation Score', 'y': 'Count'},
+        color_discrete_sequence=[SPOTIFY_GREEN]
+    )
+    fig.update_traces(width=(edges[1] - edges[0]) * 0.95)
+    return fig
+
 # ============================================================================
 # SIDEBAR FILTERS
 # ============================================================================
@@ -568,57 +903,56 @@ def load_listening_data(start_date, end_date):
 st.sidebar.title("🎛️ Filters")
 
 # Load data for filter options
-daily_data = load_daily_summary()
 genre_data = load_genre_analysis()
 
-# Date range filter
-if not daily_data.empty:
-    try:
-        # Ensure DENVER_DATE is datetime type and extract date
-        daily_data['DENVER_DATE'] = pd.to_datetime(daily_data['DENVER_DATE'])
-        min_date = daily_data['DENVER_DATE'].dt.date.min()
-        max_date = daily_data['DENVER_DATE'].dt.date.max()
-        
-        date_range = st.sidebar.date_input(
+# Date range filter - bounds come from a one-row MIN/MAX probe
+date_bounds = load_date_bounds()
+
+# Batch the filter widgets in a form so changing each one doesn't trigger
+# its own full rerun; the script only re-executes on Apply
+with st.sidebar.form("filters"):
+    if date_bounds:
+        min_date, max_date = date_bounds
+
+        date_range = st.date_input(
             "📅 Date Range",
             value=(max_date - timedelta(days=30), max_date),
             min_value=min_date,
             max_value=max_date
         )
-        
+
         if len(date_range) == 2:
             start_date, end_date = date_range
         else:
             start_date = end_date = date_range[0]
-    except Exception as e:
-        st.warning(f"Date filter issue: {e}. Using default date range.")
+    else:
         start_date = end_date = datetime.now().date()
-else:
-    start_date = end_date = datetime.now().date()
-
-# Genre filter - multiselect
-if not genre_data.empty:
-    available_genres = list(genre_data['PRIMARY_GENRE'].dropna().unique())
-    selected_genres = st.sidebar.multiselect(
-        "🎨 Genre", 
-        options=available_genres,
+
+    # Genre filter - multiselect
+    if not genre_data.empty:
+        available_genres = list(genre_data['PRIMARY_GENRE'].dropna().unique())
+        selected_genres = st.multiselect(
+            "🎨 Genre",
+            options=available_genres,
+            default=[],
+            help="Select one or more genres (leave empty for all)"
+        )
+    else:
+        selected_genres = []
+
+    # Time of day filter - multiselect
+    time_periods = ['Morning', 'Afternoon', 'Evening', 'Night']
+    selected_times = st.multiselect(
+        "⏰ Time of Day",
+        options=time_periods,
         default=[],
-        help="Select one or more genres (leave empty for all)"
+        help="Select one or more time periods (leave empty for all)"
     )
-else:
-    selected_genres = []
-
-# Time of day filter - multiselect
-time_periods = ['Morning', 'Afternoon', 'Evening', 'Night']
-selected_times = st.sidebar.multiselect(
-    "⏰ Time of Day",
-    options=time_periods,
-    default=[],
-    help="Select one or more time periods (leave empty for all)"
-)
 
-# Weekend filter
-weekend_filter = st.sidebar.selectbox("📅 Weekend/Weekday", ['All', 'Weekends Only', 'Weekdays Only'])
+    # Weekend filter
+    weekend_filter = st.selectbox("📅 Weekend/Weekday", ['All', 'Weekends Only', 'Weekdays Only'])
+
+    st.form_submit_button("Apply filters", use_container_width=True)
 
 # ============================================================================
 # MAIN DASHBOARD
@@ -631,332 +965,193 @@ st.markdown("### Explore your personal music listening patterns and discoveries"
 # KEY METRICS ROW
 # ============================================================================
 
-# Filter daily data based on selections
-# Convert dates to ensure proper comparison
-if not daily_data.empty:
-    # Ensure DENVER_DATE is datetime type
-    daily_data['DENVER_DATE'] = pd.to_datetime(daily_data['DENVER_DATE'])
-    
-    # Convert start_date and end_date to datetime for comparison
-    start_dt = pd.to_datetime(start_date)
-    end_dt = pd.to_datetime(end_date)
-    
-    filtered_daily = daily_data[
-        (daily_data['DENVER_DATE'] >= start_dt) &
-        (daily_data['DENVER_DATE'] <= end_dt)
-    ]
-else:
-    filtered_daily = daily_data
-
-if weekend_filter == 'Weekends Only':
-    filtered_daily = filtered_daily[filtered_daily['IS_WEEKEND'] == True]
-elif weekend_filter == 'Weekdays Only':
-    filtered_daily = filtered_daily[filtered_daily['IS_WEEKEND'] == False]
-
-# Calculate key metrics
-if not filtered_daily.empty:
-    total_plays = filtered_daily['TOTAL_PLAYS'].sum()
-    unique_tracks = filtered_daily['UNIQUE_TRACKS'].sum()
-    unique_artists = filtered_daily['UNIQUE_ARTISTS'].sum()
-    total_hours = filtered_daily['TOTAL_LISTENING_MINUTES'].sum() / 60
-    avg_daily_plays = filtered_daily['TOTAL_PLAYS'].mean()
-    
-    # Replace this entire section:
-    # col1, col2, col3, col4, col5 = st.columns(5)
-    # with col1: st.metric(...)
-
-    col1, col2, col3, col4, col5 = st.columns(5)
+# Daily data arrives already restricted to the selected date range and
+# weekend selection, with dtypes normalized inside the cached loader
+filtered_daily = load_daily_summary(start_date, end_date, weekend_filter)
 
-    with col1:
-        st.markdown(f"""
-        <div style="
-            background: linear-gradient(135deg, #0F0F0F 0%, #191414 100%);
-            border: 2px solid #1DB954;
-            padding: 1.2rem;
-            border-radius: 0.8rem;
-            box-shadow: 0 4px 8px rgba(29, 185, 84, 0.2);
-            text-align: center;
-            margin-bottom: 1rem;
-        ">
-            <div style="color: #FFFFFF; font-size: 0.9rem; font-weight: 600; margin-bottom: 0.5rem;">
-                🎵 Total Plays
-            </div>
-            <div style="color: #1DB954; font-size: 2.2rem; font-weight: 700; text-shadow: 0 2px 4px rgba(29, 185, 84, 0.3);">
-                {total_plays:,}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+# Early rejection: check once and stop before building KPI cards, tabs,
+# and empty Plotly figures when the selected range has no data
+if filtered_daily.empty:
+    st.info("No listening data in the selected range. Try widening the filters.")
+    st.stop()
 
-    with col2:
-        st.markdown(f"""
-        <div style="
-            background: linear-gradient(135deg, #0F0F0F 0%, #191414 100%);
-            border: 2px solid #1ED760;
-            padding: 1.2rem;
-            border-radius: 0.8rem;
-            box-shadow: 0 4px 8px rgba(30, 215, 96, 0.2);
-            text-align: center;
-            margin-bottom: 1rem;
-        ">
-            <div style="color: #FFFFFF; font-size: 0.9rem; font-weight: 600; margin-bottom: 0.5rem;">
-                🎤 Unique Tracks
-            </div>
-            <div style="color: #1ED760; font-size: 2.2rem; font-weight: 700; text-shadow: 0 2px 4px rgba(30, 215, 96, 0.3);">
-                {unique_tracks:,}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+# Key metrics arrive as one pre-aggregated row from Snowflake
+kpis = load_kpis(start_date, end_date, weekend_filter)
+if kpis:
+    total_plays, unique_tracks, unique_artists, total_hours, avg_daily_plays = kpis
 
-    with col3:
-        st.markdown(f"""
-        <div style="
-            background: linear-gradient(135deg, #0F0F0F 0%, #191414 100%);
-            border: 2px solid #4ECDC4;
-            padding: 1.2rem;
-            border-radius: 0.8rem;
-            box-shadow: 0 4px 8px rgba(78, 205, 196, 0.2);
-            text-align: center;
-            margin-bottom: 1rem;
-        ">
-            <div style="color: #FFFFFF; font-size: 0.9rem; font-weight: 600; margin-bottom: 0.5rem;">
-                👨‍🎤 Unique Artists
-            </div>
-            <div style="color: #4ECDC4; font-size: 2.2rem; font-weight: 700; text-shadow: 0 2px 4px rgba(78, 205, 196, 0.3);">
-                {unique_artists:,}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+    # One flex row rendered with a single st.markdown call: each extra
+    # markdown element is its own websocket message and React mount, so
+    # batching the five cards cuts this block to one render per rerun.
+    kpi_cards = (
+        ("🎵 Total Plays", f"{total_plays:,}", "#1DB954", "29, 185, 84"),
+        ("🎤 Unique Tracks", f"{unique_tracks:,}", "#1ED760", "30, 215, 96"),
+        ("👨\u200d🎤 Unique Artists", f"{unique_artists:,}", "#4ECDC4", "78, 205, 196"),
+        ("⏱️ Hours Listened", f"{total_hours:.1f}", "#45B7D1", "69, 183, 209"),
+        ("📊 Avg Daily Plays", f"{avg_daily_plays:.1f}", "#96CEB4", "150, 206, 180"),
+    )
 
-    with col4:
-        st.markdown(f"""
+    card_html = "".join(f"""
         <div style="
+            flex: 1;
             background: linear-gradient(135deg, #0F0F0F 0%, #191414 100%);
-            border: 2px solid #45B7D1;
+            border: 2px solid {accent};
             padding: 1.2rem;
             border-radius: 0.8rem;
-            box-shadow: 0 4px 8px rgba(69, 183, 209, 0.2);
+            box-shadow: 0 4px 8px rgba({accent_rgb}, 0.2);
             text-align: center;
-            margin-bottom: 1rem;
         ">
             <div style="color: #FFFFFF; font-size: 0.9rem; font-weight: 600; margin-bottom: 0.5rem;">
-                ⏱️ Hours Listened
+                {label}
             </div>
-            <div style="color: #45B7D1; font-size: 2.2rem; font-weight: 700; text-shadow: 0 2px 4px rgba(69, 183, 209, 0.3);">
-                {total_hours:.1f}
+            <div style="color: {accent}; font-size: 2.2rem; font-weight: 700; text-shadow: 0 2px 4px rgba({accent_rgb}, 0.3);">
+                {value}
             </div>
         </div>
-        """, unsafe_allow_html=True)
+    """ for label, value, accent, accent_rgb in kpi_cards)
 
-    with col5:
-        st.markdown(f"""
-        <div style="
-            background: linear-gradient(135deg, #0F0F0F 0%, #191414 100%);
-            border: 2px solid #96CEB4;
-            padding: 1.2rem;
-            border-radius: 0.8rem;
-            box-shadow: 0 4px 8px rgba(150, 206, 180, 0.2);
-            text-align: center;
-            margin-bottom: 1rem;
-        ">
-            <div style="color: #FFFFFF; font-size: 0.9rem; font-weight: 600; margin-bottom: 0.5rem;">
-                📊 Avg Daily Plays
-            </div>
-            <div style="color: #96CEB4; font-size: 2.2rem; font-weight: 700; text-shadow: 0 2px 4px rgba(150, 206, 180, 0.3);">
-                {avg_daily_plays:.1f}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown(
+        f'<div style="display: flex; gap: 1rem; margin-bottom: 1rem;">{card_html}</div>',
+        unsafe_allow_html=True
+    )
 
 # ============================================================================
-# TABS FOR DIFFERENT ANALYSES
+# ANALYSIS VIEWS
 # ============================================================================
 
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📈 Trends", "🎨 Genres", "👨‍🎤 Artists", "⏰ Time Patterns", "🔍 Detailed View", "🤖 ML Recommendations"])
+# View selector instead of st.tabs: Streamlit executes every tab body on
+# every rerun regardless of which tab is visible, so a single widget
+# change used to run all six query/chart pipelines. With the radio, only
+# the active view's work executes; st.session_state keeps the selection
+# across reruns.
+VIEW_NAMES = ("📈 Trends", "🎨 Genres", "👨‍🎤 Artists", "⏰ Time Patterns",
+              "🔍 Detailed View", "🤖 ML Recommendations")
+selected_view = st.radio("View", VIEW_NAMES, horizontal=True,
+                         label_visibility='collapsed', key='view')
 
 # ============================================================================
-# TAB 1: LISTENING TRENDS
+# VIEW: LISTENING TRENDS
 # ============================================================================
 
-with tab1:
+if selected_view == "📈 Trends":
     st.header("📈 Listening Trends Over Time")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        # Daily listening trend
-        if not filtered_daily.empty:
-            fig_daily = px.line(
-                filtered_daily,
-                x='DENVER_DATE',
+        # Daily listening trend - filtered_daily is non-empty past the
+        # early-stop guard above, so no per-chart emptiness checks
+        fig_daily = px.line(
+            filtered_daily[['DENVER_DATE', 'TOTAL_PLAYS']],
+            x='DENVER_DATE',
+            y='TOTAL_PLAYS',
+            title='Daily Listening Activity',
+            labels={'TOTAL_PLAYS': 'Number of Plays', 'DENVER_DATE': 'Date'},
+            color_discrete_sequence=[SPOTIFY_GREEN]
+        )
+        fig_daily.update_layout(height=400)
+        st.plotly_chart(fig_daily, use_container_width=True)
+
+        # Genre diversity over time
+        fig_diversity = px.line(
+            filtered_daily[['DENVER_DATE', 'GENRE_DIVERSITY_SCORE']],
+            x='DENVER_DATE',
+            y='GENRE_DIVERSITY_SCORE',
+            title='Genre Diversity Score Over Time',
+            labels={'GENRE_DIVERSITY_SCORE': 'Genre Diversity %', 'DENVER_DATE': 'Date'},
+            color_discrete_sequence=[SPOTIFY_DARK_GREEN]
+        )
+        fig_diversity.update_layout(height=400)
+        st.plotly_chart(fig_diversity, use_container_width=True)
+
+    with col2:
+        # Weekly pattern - grouped in Snowflake, arrives as <= 7 rows
+        weekly_avg = load_weekly_pattern(start_date, end_date, weekend_filter)
+
+        if not weekly_avg.empty:
+            # Fixed seven-row frame: a reindex against the known day order
+            # replaces the Categorical conversion + sort, and the full day
+            # names come from mapping the reordered index
+            weekly_avg = weekly_avg.set_index('DAY_OF_WEEK').reindex(DAY_ORDER).dropna()
+            weekly_avg['DAY_FULL'] = weekly_avg.index.map(DAY_MAPPING)
+
+            fig_weekly = px.line(
+                weekly_avg,
+                x='DAY_FULL',
                 y='TOTAL_PLAYS',
-                title='Daily Listening Activity',
-                labels={'TOTAL_PLAYS': 'Number of Plays', 'DENVER_DATE': 'Date'},
-                color_discrete_sequence=[SPOTIFY_GREEN]
+                title='Average Plays by Day of Week',
+                labels={'TOTAL_PLAYS': 'Average Plays', 'DAY_FULL': 'Day'},
+                color_discrete_sequence=[SPOTIFY_GREEN],
+                markers=True
             )
-            fig_daily.update_layout(height=400)
-            fig_daily = apply_spotify_theme(fig_daily)
-            st.plotly_chart(fig_daily, use_container_width=True)
+            fig_weekly.update_traces(
+                line=dict(color=SPOTIFY_GREEN, width=3),
+                marker=dict(color=SPOTIFY_GREEN, size=8)
+            )
+            fig_weekly.update_layout(height=400)
+            st.plotly_chart(fig_weekly, use_container_width=True)
         
-        # Genre diversity over time
-        if not filtered_daily.empty:
-            fig_diversity = px.line(
-                filtered_daily,
-                x='DENVER_DATE',
-                y='GENRE_DIVERSITY_SCORE',
-                title='Genre Diversity Score Over Time',
-                labels={'GENRE_DIVERSITY_SCORE': 'Genre Diversity %', 'DENVER_DATE': 'Date'},
+        # Monthly trend - already restricted to the selected window in SQL
+        monthly_filtered = load_monthly_insights(start_date, end_date)
+        if not monthly_filtered.empty:
+            fig_monthly = px.bar(
+                monthly_filtered,
+                x='MONTH_NAME',
+                y='TOTAL_PLAYS',
+                title='Monthly Listening Activity',
+                labels={'TOTAL_PLAYS': 'Total Plays', 'MONTH_NAME': 'Month'},
                 color_discrete_sequence=[SPOTIFY_DARK_GREEN]
             )
-            fig_diversity.update_layout(height=400)
-            fig_diversity = apply_spotify_theme(fig_diversity)
-            st.plotly_chart(fig_diversity, use_container_width=True)
-    
-    with col2:
-        # Weekly pattern
-        if not filtered_daily.empty:
-            weekly_avg = filtered_daily.groupby('DAY_OF_WEEK')['TOTAL_PLAYS'].mean().reset_index()
-            
-            if not weekly_avg.empty:
-                # Map abbreviated day names to full names and set correct order (Sunday first)
-                day_mapping = {
-                    'Sun': 'Sunday',
-                    'Mon': 'Monday', 
-                    'Tue': 'Tuesday',
-                    'Wed': 'Wednesday',
-                    'Thu': 'Thursday',
-                    'Fri': 'Friday',
-                    'Sat': 'Saturday'
-                }
-                
-                # Map to full day names
-                weekly_avg['DAY_FULL'] = weekly_avg['DAY_OF_WEEK'].map(day_mapping)
-                
-                # Set correct order (Sunday through Saturday)
-                day_order = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-                weekly_avg['DAY_FULL'] = pd.Categorical(weekly_avg['DAY_FULL'], categories=day_order, ordered=True)
-                weekly_avg = weekly_avg.sort_values('DAY_FULL')
-                
-                fig_weekly = px.line(
-                    weekly_avg,
-                    x='DAY_FULL',
-                    y='TOTAL_PLAYS',
-                    title='Average Plays by Day of Week',
-                    labels={'TOTAL_PLAYS': 'Average Plays', 'DAY_FULL': 'Day'},
-                    color_discrete_sequence=[SPOTIFY_GREEN],
-                    markers=True
-                )
-                fig_weekly.update_traces(
-                    line=dict(color=SPOTIFY_GREEN, width=3),
-                    marker=dict(color=SPOTIFY_GREEN, size=8)
-                )
-                fig_weekly.update_layout(height=400)
-                fig_weekly = apply_spotify_theme(fig_weekly)
-                st.plotly_chart(fig_weekly, use_container_width=True)
-        
-        # Monthly trend
-        monthly_data = load_monthly_insights()
-        if not monthly_data.empty:
-            monthly_data['date'] = pd.to_datetime(monthly_data[['YEAR', 'MONTH']].assign(day=1))
-            
-            # Convert start_date and end_date to datetime for comparison
-            start_dt = pd.to_datetime(start_date)
-            end_dt = pd.to_datetime(end_date)
-            
-            monthly_filtered = monthly_data[
-                (monthly_data['date'] >= start_dt) &
-                (monthly_data['date'] <= end_dt)
-            ]
-            
-            if not monthly_filtered.empty:
-                fig_monthly = px.bar(
-                    monthly_filtered,
-                    x='MONTH_NAME',
-                    y='TOTAL_PLAYS',
-                    title='Monthly Listening Activity',
-                    labels={'TOTAL_PLAYS': 'Total Plays', 'MONTH_NAME': 'Month'},
-                    color_discrete_sequence=[SPOTIFY_DARK_GREEN]
-                )
-                fig_monthly.update_layout(height=400)
-                fig_monthly = apply_spotify_theme(fig_monthly)
-                st.plotly_chart(fig_monthly, use_container_width=True)
+            fig_monthly.update_layout(height=400)
+            st.plotly_chart(fig_monthly, use_container_width=True)
 
 # ============================================================================
-# TAB 2: GENRE ANALYSIS
+# VIEW: GENRE ANALYSIS
 # ============================================================================
 
-with tab2:
+if selected_view == "🎨 Genres":
     st.header("🎨 Genre Analysis")
-    
-    # Apply filters to genre data based on time and weekend selections
-    if not genre_data.empty:
-        # Load detailed listening data to apply filters
-        listening_detail = load_listening_data(start_date, end_date)
-        if not listening_detail.empty:
-            # Apply sidebar filters to the detailed data
-            filtered_listening = filter_data_by_sidebar(listening_detail, selected_genres, selected_times, weekend_filter)
-            
-            # Recalculate genre stats from filtered data
-            if not filtered_listening.empty:
-                genre_stats = filtered_listening.groupby('PRIMARY_GENRE').agg({
-                    'TRACK_NAME': 'count',  # Total plays
-                    'PRIMARY_ARTIST_NAME': 'nunique',  # Unique artists
-                    'TRACK_DURATION_MINUTES': 'sum'  # Total listening time
-                }).round(2)
-                genre_stats.columns = ['TOTAL_PLAYS', 'UNIQUE_ARTISTS', 'TOTAL_LISTENING_MINUTES']
-                genre_stats = genre_stats.reset_index().sort_values('TOTAL_PLAYS', ascending=False)
-                genre_stats['PERCENTAGE_OF_TOTAL_LISTENING'] = (
-                    100 * genre_stats['TOTAL_PLAYS'] / genre_stats['TOTAL_PLAYS'].sum()
-                ).round(2)
-            else:
-                genre_stats = pd.DataFrame()
-        else:
-            genre_stats = genre_data  # Fallback to original data
-    else:
-        genre_stats = genre_data
+
+    # Genre rollup computed in Snowflake for the active sidebar filters -
+    # previously the full row-level detail was fetched and grouped in
+    # pandas on every rerun just to produce ~20 genre rows
+    genre_stats = load_genre_stats(
+        start_date, end_date,
+        tuple(selected_genres), tuple(selected_times), weekend_filter
+    )
+
+    # Arrives ORDER BY total_plays DESC from Snowflake, so one top-20
+    # slice feeds the pie (10), bar (15) and details table (20) without
+    # any client-side re-sort
+    top20_genres = genre_stats.head(20)
     
     col1, col2 = st.columns(2)
     
+    # Hand the builders only the columns each figure plots - everything in
+    # the frame gets serialized into the chart payload sent to the browser
     with col1:
         # Top genres pie chart
         if not genre_stats.empty:
-            top_genres = genre_stats.head(10)
-            fig_pie = px.pie(
-                top_genres,
-                values='TOTAL_PLAYS',
-                names='PRIMARY_GENRE',
-                title='Top 10 Genres by Plays',
-                color_discrete_sequence=SPOTIFY_COLORS
+            st.plotly_chart(
+                make_genre_pie(top20_genres[['PRIMARY_GENRE', 'TOTAL_PLAYS']].head(10)),
+                use_container_width=True
             )
-            fig_pie.update_layout(height=500)
-            fig_pie = apply_spotify_theme(fig_pie)
-            st.plotly_chart(fig_pie, use_container_width=True)
-    
+
     with col2:
         # Genre metrics bar chart
         if not genre_stats.empty:
-            fig_bar = px.bar(
-                genre_stats.head(15),
-                x='TOTAL_PLAYS',
-                y='PRIMARY_GENRE',
-                orientation='h',
-                title='Top 15 Genres by Total Plays',
-                labels={'TOTAL_PLAYS': 'Total Plays', 'PRIMARY_GENRE': 'Genre'},
-                color_discrete_sequence=[SPOTIFY_GREEN]
+            st.plotly_chart(
+                make_genre_bar(top20_genres[['PRIMARY_GENRE', 'TOTAL_PLAYS']].head(15)),
+                use_container_width=True
             )
-            fig_bar.update_layout(height=500)
-            fig_bar = apply_spotify_theme(fig_bar)
-            st.plotly_chart(fig_bar, use_container_width=True)
     
     # Genre details table
     st.subheader("🎵 Genre Details")
     if not genre_stats.empty:
-        display_genres = genre_stats[['PRIMARY_GENRE', 'TOTAL_PLAYS', 'UNIQUE_ARTISTS', 
-                                    'TOTAL_LISTENING_MINUTES', 'PERCENTAGE_OF_TOTAL_LISTENING']].head(20)
-        
-        # Format the dataframe for better display
-        display_genres['TOTAL_LISTENING_HOURS'] = (display_genres['TOTAL_LISTENING_MINUTES'] / 60).round(1)
-        display_genres = display_genres.drop('TOTAL_LISTENING_MINUTES', axis=1)
-        
+        # Hours are computed in the SQL rollup, so no per-rerun division
+        display_genres = top20_genres[['PRIMARY_GENRE', 'TOTAL_PLAYS', 'UNIQUE_ARTISTS',
+                                     'TOTAL_LISTENING_HOURS', 'PERCENTAGE_OF_TOTAL_LISTENING']]
+
         st.dataframe(
             display_genres,
             use_container_width=True,
@@ -971,70 +1166,49 @@ with tab2:
         )
 
 # ============================================================================
-# TAB 3: ARTIST ANALYSIS
+# VIEW: ARTIST ANALYSIS
 # ============================================================================
 
-with tab3:
+if selected_view == "👨‍🎤 Artists":
     st.header("👨‍🎤 Artist Analysis")
     
-    # Apply filters to artist data
-    artist_data = load_artist_summary()
-    if not artist_data.empty:
-        # Apply genre filters if selected
-        if selected_genres:
-            artist_data = artist_data[artist_data['PRIMARY_GENRE'].isin(selected_genres)]
-    
+    # Genre filter applied in Snowflake inside the cached loader
+    artist_data = load_artist_summary(tuple(selected_genres))
+
+    # The loader's ORDER BY total_plays DESC means one top-50 slice feeds
+    # the bar (15), scatter (50) and table (25) instead of three
+    # independent head() calls on the full frame
+    top50_artists = artist_data.head(50)
+
     col1, col2 = st.columns(2)
-    
+
     with col1:
-        # Top artists
+        # Top artists - only the two plotted columns go to the figure
         if not artist_data.empty:
-            top_artists = artist_data.head(15)
-            fig_artists = px.bar(
-                top_artists,
-                x='TOTAL_PLAYS',
-                y='ARTIST_NAME',
-                orientation='h',
-                title='Top 15 Most Played Artists',
-                labels={'TOTAL_PLAYS': 'Total Plays', 'ARTIST_NAME': 'Artist'},
-                color_discrete_sequence=[SPOTIFY_GREEN]
+            st.plotly_chart(
+                make_artist_bar(top50_artists[['ARTIST_NAME', 'TOTAL_PLAYS']].head(15)),
+                use_container_width=True
             )
-            fig_artists.update_layout(height=600)
-            fig_artists = apply_spotify_theme(fig_artists)
-            st.plotly_chart(fig_artists, use_container_width=True)
-    
+
     with col2:
         # Artist discovery scatter plot
         if not artist_data.empty:
-            fig_scatter = px.scatter(
-                artist_data.head(50),
-                x='TOTAL_LISTENING_MINUTES',
-                y='UNIQUE_TRACKS_PLAYED',
-                size='TOTAL_PLAYS',
-                color='PRIMARY_GENRE',
-                hover_name='ARTIST_NAME',
-                title='Artist Discovery: Listening Time vs Track Diversity',
-                labels={
-                    'TOTAL_LISTENING_MINUTES': 'Total Listening Minutes',
-                    'UNIQUE_TRACKS_PLAYED': 'Unique Tracks Played'
-                },
-                color_discrete_sequence=SPOTIFY_COLORS
+            st.plotly_chart(
+                make_artist_scatter(top50_artists[[
+                    'TOTAL_LISTENING_MINUTES', 'UNIQUE_TRACKS_PLAYED',
+                    'TOTAL_PLAYS', 'PRIMARY_GENRE', 'ARTIST_NAME'
+                ]]),
+                use_container_width=True
             )
-            fig_scatter.update_layout(height=600)
-            fig_scatter = apply_spotify_theme(fig_scatter)
-            st.plotly_chart(fig_scatter, use_container_width=True)
     
     # Artist details table
     st.subheader("🎤 Artist Details")
     if not artist_data.empty:
-        display_artists = artist_data[['ARTIST_NAME', 'PRIMARY_GENRE', 'TOTAL_PLAYS', 
-                                     'UNIQUE_TRACKS_PLAYED', 'TOTAL_LISTENING_MINUTES',
-                                     'ARTIST_POPULARITY', 'WEEKEND_PLAY_PERCENTAGE']].head(25)
-        
-        # Format the dataframe
-        display_artists['TOTAL_LISTENING_HOURS'] = (display_artists['TOTAL_LISTENING_MINUTES'] / 60).round(1)
-        display_artists = display_artists.drop('TOTAL_LISTENING_MINUTES', axis=1)
-        
+        # Hours come precomputed from the loader's SQL projection
+        display_artists = top50_artists[['ARTIST_NAME', 'PRIMARY_GENRE', 'TOTAL_PLAYS',
+                                       'UNIQUE_TRACKS_PLAYED', 'TOTAL_LISTENING_HOURS',
+                                       'ARTIST_POPULARITY', 'WEEKEND_PLAY_PERCENTAGE']].head(25)
+
         st.dataframe(
             display_artists,
             use_container_width=True,
@@ -1050,94 +1224,84 @@ with tab3:
         )
 
 # ============================================================================
-# TAB 4: TIME PATTERNS
+# VIEW: TIME PATTERNS
 # ============================================================================
 
-with tab4:
+if selected_view == "⏰ Time Patterns":
     st.header("⏰ Listening Time Patterns")
-    
-    # Load detailed data for time analysis
-    listening_data = load_listening_data(start_date, end_date)
-    
-    # Apply sidebar filters to listening data
-    if not listening_data.empty:
-        listening_data = filter_data_by_sidebar(listening_data, selected_genres, selected_times, weekend_filter)
-    
-    if not listening_data.empty:
+
+    # Row-level detail is only needed by this view, so the heaviest fetch
+    # and the sidebar mask run lazily here rather than on every rerun
+    time_data = load_listening_data(start_date, end_date)
+    if not time_data.empty:
+        time_data = filter_data_by_sidebar(
+            time_data, selected_genres, selected_times, weekend_filter
+        )
+
+    if not time_data.empty:
+        # Fused hour-of-day histogram: hour and weekend are tiny ints, so
+        # one bincount over the combined code (is_weekend * 24 + hour)
+        # builds the 2x24 matrix in a single linear pass with no hash
+        # aggregation, and the plain hourly counts fall out of a sum.
+        # These counts are the only client-side reductions left (the heavy
+        # rollups run in Snowflake), so they stay in NumPy/pandas rather
+        # than pulling in a JIT dependency.
+        hour_codes = time_data['DENVER_HOUR'].to_numpy(np.int64)
+        weekend_codes = time_data['IS_WEEKEND'].to_numpy(np.int64)
+        hour_weekend_counts = np.bincount(
+            weekend_codes * 24 + hour_codes, minlength=48
+        ).reshape(2, 24)
+
+        # The time-of-day and source distributions ride the same pass over
+        # the already-in-cache columns: their category codes feed bincount
+        # directly, so all four tab charts share one scan of the frame
+        def _category_counts(column, name):
+            # -1 codes mark nulls; drop them before counting
+            codes = column.cat.codes.to_numpy(np.int64)
+            counts = np.bincount(codes[codes >= 0],
+                                 minlength=len(column.cat.categories))
+            return pd.DataFrame({name: column.cat.categories, 'PLAYS': counts})
+
+        time_dist = _category_counts(time_data['TIME_OF_DAY_CATEGORY'],
+                                     'TIME_OF_DAY_CATEGORY')
+        if 'LISTENING_SOURCE' in time_data.columns:
+            source_dist = _category_counts(time_data['LISTENING_SOURCE'],
+                                           'LISTENING_SOURCE')
+        else:
+            source_dist = pd.DataFrame()
+
         col1, col2 = st.columns(2)
-        
+
         with col1:
             # Hourly listening pattern
-            hourly_data = listening_data.groupby('DENVER_HOUR').size().reset_index(name='PLAYS')
-            fig_hourly = px.line(
-                hourly_data,
-                x='DENVER_HOUR',
-                y='PLAYS',
-                title='Listening Activity by Hour of Day',
-                labels={'DENVER_HOUR': 'Hour of Day', 'PLAYS': 'Number of Plays'},
-                color_discrete_sequence=[SPOTIFY_GREEN]
-            )
-            fig_hourly.update_layout(
-                height=400,
-                xaxis=dict(tickmode='array', tickvals=list(range(0, 24, 2)))
-            )
-            fig_hourly = apply_spotify_theme(fig_hourly)
-            st.plotly_chart(fig_hourly, use_container_width=True)
-            
-            # Time of day distribution
-            time_dist = listening_data.groupby('TIME_OF_DAY_CATEGORY').size().reset_index(name='PLAYS')
-            fig_time = px.pie(
-                time_dist,
-                values='PLAYS',
-                names='TIME_OF_DAY_CATEGORY',
-                title='Distribution by Time of Day',
-                color_discrete_sequence=SPOTIFY_COLORS
-            )
-            fig_time.update_layout(height=400)
-            fig_time = apply_spotify_theme(fig_time)
-            st.plotly_chart(fig_time, use_container_width=True)
+            hourly_data = pd.DataFrame({
+                'DENVER_HOUR': np.arange(24),
+                'PLAYS': hour_weekend_counts.sum(axis=0)
+            })
+            st.plotly_chart(make_hourly_line(hourly_data), use_container_width=True)
+
+            # Time of day distribution - counted in the fused pass above
+            st.plotly_chart(make_time_of_day_pie(time_dist), use_container_width=True)
         
         with col2:
-            # Weekend vs weekday patterns
-            weekend_data = listening_data.groupby(['IS_WEEKEND', 'DENVER_HOUR']).size().reset_index(name='PLAYS')
-            weekend_data['DAY_TYPE'] = weekend_data['IS_WEEKEND'].map({True: 'Weekend', False: 'Weekday'})
-            
-            fig_weekend = px.line(
-                weekend_data,
-                x='DENVER_HOUR',
-                y='PLAYS',
-                color='DAY_TYPE',
-                title='Hourly Patterns: Weekdays vs Weekends',
-                labels={'DENVER_HOUR': 'Hour of Day', 'PLAYS': 'Average Plays'},
-                color_discrete_sequence=[SPOTIFY_GREEN, SPOTIFY_DARK_GREEN]
-            )
-            fig_weekend.update_layout(
-                height=400,
-                xaxis=dict(tickmode='array', tickvals=list(range(0, 24, 2)))
-            )
-            fig_weekend = apply_spotify_theme(fig_weekend)
-            st.plotly_chart(fig_weekend, use_container_width=True)
-            
-            # Listening source distribution
-            if 'LISTENING_SOURCE' in listening_data.columns:
-                source_dist = listening_data.groupby('LISTENING_SOURCE').size().reset_index(name='PLAYS')
-                fig_source = px.bar(
-                    source_dist,
-                    x='LISTENING_SOURCE',
-                    y='PLAYS',
-                    title='Listening Source Distribution',
-                    labels={'LISTENING_SOURCE': 'Source', 'PLAYS': 'Number of Plays'},
-                    color_discrete_sequence=[SPOTIFY_DARK_GREEN]
-                )
-                fig_source.update_layout(height=400)
-                fig_source = apply_spotify_theme(fig_source)
-                st.plotly_chart(fig_source, use_container_width=True)
+            # Weekend vs weekday patterns - long-form frame straight from
+            # the fused count matrix computed above
+            weekend_data = pd.DataFrame({
+                'DENVER_HOUR': np.tile(np.arange(24), 2),
+                'DAY_TYPE': np.repeat(('Weekday', 'Weekend'), 24),
+                'PLAYS': hour_weekend_counts.reshape(-1)
+            })
+            st.plotly_chart(make_weekend_line(weekend_data), use_container_width=True)
+
+            # Listening source distribution - counted in the fused pass above
+            if not source_dist.empty:
+                st.plotly_chart(make_source_bar(source_dist), use_container_width=True)
 
 # ============================================================================
-# TAB 5: DETAILED VIEW
+# VIEW: DETAILED VIEW
 # ============================================================================
 
-with tab5:
+if selected_view == "🔍 Detailed View":
     st.header("🔍 Detailed Track Data")
     
     # Filters for detailed view
@@ -1154,28 +1318,16 @@ with tab5:
         if selected_genres:
             st.info(f"Filtered by genres: {', '.join(selected_genres)}")
     
-    # Load and filter detailed data
-    listening_data = load_listening_data(start_date, end_date)
-    
-    if not listening_data.empty:
-        # Apply sidebar filters using our helper function
-        listening_data = filter_data_by_sidebar(listening_data, selected_genres, selected_times, weekend_filter)
-        
-        # Sort data
-        if sort_by == 'Latest First':
-            listening_data = listening_data.sort_values('DENVER_TIMESTAMP', ascending=False)
-        elif sort_by == 'Track Popularity':
-            listening_data = listening_data.sort_values('TRACK_POPULARITY', ascending=False)
-        elif sort_by == 'Artist Popularity':
-            listening_data = listening_data.sort_values('ARTIST_POPULARITY', ascending=False)
-        elif sort_by == 'Duration':
-            listening_data = listening_data.sort_values('TRACK_DURATION_MINUTES', ascending=False)
-        
-        # Display data
-        display_data = listening_data[['DENVER_TIMESTAMP', 'TRACK_NAME', 'PRIMARY_ARTIST_NAME', 
-                                     'PRIMARY_GENRE', 'ALBUM_NAME', 'TRACK_DURATION_MINUTES',
-                                     'TRACK_POPULARITY', 'TIME_OF_DAY_CATEGORY']].head(limit)
-        
+    # Page of rows sorted and limited in Snowflake - only what is shown
+    # travels to the client, instead of fetching the whole window and
+    # sorting/truncating it in pandas
+    display_data = load_detail_page(
+        start_date, end_date,
+        tuple(selected_genres), tuple(selected_times), weekend_filter,
+        sort_by, limit
+    )
+
+    if not display_data.empty:
         st.dataframe(
             display_data,
             use_container_width=True,
@@ -1191,31 +1343,47 @@ with tab5:
             }
         )
         
-        # Summary stats for filtered data
-        st.subheader("📊 Filtered Data Summary")
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric("Total Records", len(listening_data))
-        with col2:
-            st.metric("Unique Tracks", listening_data['TRACK_NAME'].nunique())
-        with col3:
-            st.metric("Unique Artists", listening_data['PRIMARY_ARTIST_NAME'].nunique())
-        with col4:
-            st.metric("Time Period", f"{(listening_data['DENVER_TIMESTAMP'].max() - listening_data['DENVER_TIMESTAMP'].min()).days} days")
+        # Summary stats for filtered data - five scalars from one cached
+        # aggregate query, covering all matching rows, not just the page
+        detail_summary = load_detail_summary(
+            start_date, end_date,
+            tuple(selected_genres), tuple(selected_times), weekend_filter
+        )
+        if detail_summary:
+            total_records, unique_tracks, unique_artists, first_play, last_play = detail_summary
+
+            st.subheader("📊 Filtered Data Summary")
+            col1, col2, col3, col4 = st.columns(4)
+
+            with col1:
+                st.metric("Total Records", total_records)
+            with col2:
+                st.metric("Unique Tracks", unique_tracks)
+            with col3:
+                st.metric("Unique Artists", unique_artists)
+            with col4:
+                st.metric("Time Period", f"{(last_play - first_play).days} days")
 
 # ============================================================================
 # FOOTER
 # ============================================================================
 
 # ============================================================================
-# TAB 6: ML RECOMMENDATIONS
+# VIEW: ML RECOMMENDATIONS
 # ============================================================================
 
-with tab6:
+if selected_view == "🤖 ML Recommendations":
     st.header("🤖 AI-Powered Music Recommendations")
     st.markdown("*Discover new music tailored to your taste using machine learning*")
-    
+
+    # One wall-clock read per rerun; repeated datetime.now() calls risked
+    # straddling an hour boundary, which would also split the cache keys
+    # of the time-based loaders
+    _now = datetime.now()
+    _hour = _now.hour
+    _weekend = _now.weekday() >= 5
+
+
     # Create two columns for controls and info
     col1, col2 = st.columns([2, 1])
     
@@ -1259,352 +1427,246 @@ with tab6:
     
     # Generate recommendations button
     if st.button("🎵 Generate Recommendations", type="primary"):
+        # Current-time context for the temporal strategies
+        if strategy_type == "Hybrid (All)" and not include_current_time:
+            ctx_hour = ctx_weekend = None
+        else:
+            ctx_hour = _hour
+            ctx_weekend = _weekend
+
         with st.spinner("🤖 AI is analyzing your music taste..."):
-            try:
-                # Determine which strategy to use
-                if strategy_type == "Hybrid (All)":
-                    # Use hybrid recommendations with current context
-                    current_hour = datetime.now().hour if include_current_time else None
-                    is_weekend = datetime.now().weekday() >= 5 if include_current_time else None
-                    
-                    recs_query = f"""
-                    SELECT * FROM TABLE(get_spotify_recommendations(
-                        {num_recs}, 
-                        {current_hour if current_hour else 'NULL'}, 
-                        {is_weekend if is_weekend is not None else 'NULL'},
-                        NULL,
-                        {min_score}
-                    ))
-                    """
+            recommendations_df = load_recommendations(
+                strategy_type, num_recs, min_score, max_popularity,
+                ctx_hour, ctx_weekend
+            )
+
+        if recommendations_df is None:
+            st.info("💡 Make sure you have:")
+            st.info("• Sufficient listening history (at least 50 tracks)")
+            st.info("• The ML recommendation views are set up in Snowflake")
+            st.info("• Run the ML training scripts first")
+        elif recommendations_df.empty:
+            st.warning("No recommendations found. Try adjusting your filters or ensure you have enough listening history.")
+        else:
+            st.success(f"🎵 Generated {len(recommendations_df)} personalized recommendations!")
+            
+            # Display recommendations in an attractive format
+            st.subheader("🎧 Your Personalized Playlist")
+            
+            # Create tabs for different views
+            rec_tab1, rec_tab2, rec_tab3 = st.tabs(["🎵 Playlist View", "📊 Analytics", "🔗 Quick Actions"])
+
+            # Normalize the per-strategy score and popularity columns once,
+            # vectorized, instead of chained .get() fallbacks plus
+            # float()/int() casts inside the card loop
+            _score = pd.Series(0.0, index=recommendations_df.index)
+            for _col in ('SIMILARITY_SCORE', 'TEMPORAL_SCORE', 'RECOMMENDATION_SCORE'):
+                if _col in recommendations_df.columns:
+                    _score = recommendations_df[_col].fillna(_score)
+            recommendations_df['_SCORE'] = _score.astype('float32')
+            if 'TRACK_POPULARITY' in recommendations_df.columns:
+                recommendations_df['_POP'] = (
+                    recommendations_df['TRACK_POPULARITY'].fillna(0).astype('int16')
+                )
+            else:
+                recommendations_df['_POP'] = np.int16(0)
+            # Resolve the play-link URL here too: the loop's .get() built
+            # the track-id fallback string eagerly for every row and still
+            # passed NULLs through when the column existed but was empty
+            if 'TRACK_ID' in recommendations_df.columns:
+                _url_fallback = ('https://open.spotify.com/track/'
+                                 + recommendations_df['TRACK_ID'].astype(str))
+            else:
+                _url_fallback = ''
+            if 'SPOTIFY_URL' in recommendations_df.columns:
+                _url = recommendations_df['SPOTIFY_URL']
+                recommendations_df['_URL'] = _url.where(_url.notna(), _url_fallback)
+            else:
+                recommendations_df['_URL'] = _url_fallback
+
+            # One dict per row for the card and export loops - iterrows()
+            # built a fresh pd.Series per track on every rerun
+            records = recommendations_df.to_dict('records')
+
+            with rec_tab1:
+                # Batch every card into one st.markdown: the per-track
+                # container/columns/metric/caption/divider combination sent
+                # ~9 frontend deltas per track (hundreds per render); one
+                # concatenated HTML string is a single message
+                cards = []
+                for track in records:
+                    spotify_url = track['_URL']
+                    play_link = ''
+                    if spotify_url and 'open.spotify.com' in spotify_url:
+                        play_link = REC_PLAY_LINK_TPL.format_map(
+                            {'spotify_url': spotify_url})
+
+                    cards.append(REC_CARD_TPL.format_map({
+                        'track_name': track.get('TRACK_NAME', 'Unknown Track'),
+                        'artist_name': track.get('ARTIST_NAME',
+                            track.get('PRIMARY_ARTIST_NAME', 'Unknown Artist')),
+                        'album_name': track.get('ALBUM_NAME', 'Unknown Album'),
+                        'genre': track.get('GENRE', track.get('PRIMARY_GENRE', 'Unknown')),
+                        'score': track['_SCORE'],
+                        'popularity': track['_POP'],
+                        'play_link': play_link,
+                        'reason': track.get('RECOMMENDATION_REASON',
+                            track.get('SIMILARITY_REASON',
+                            track.get('DISCOVERY_REASON', 'AI recommended'))),
+                    }))
+
+                st.markdown(''.join(cards), unsafe_allow_html=True)
+            
+            with rec_tab2:
+                # Analytics about the recommendations
+                st.subheader("📊 Recommendation Analytics")
                 
-                elif strategy_type == "Collaborative Filtering":
-                    recs_query = f"""
-                    SELECT 
-                        track_id,
-                        track_name,
-                        primary_artist_name as artist_name,
-                        primary_genre as genre,
-                        album_name,
-                        track_popularity,
-                        recommendation_score,
-                        'https://open.spotify.com/track/' || track_id as spotify_url,
-                        'Collaborative Filtering' as recommendation_reason
-                    FROM ml_collaborative_recommendations 
-                    WHERE recommendation_score >= {min_score}
-                    ORDER BY recommendation_score DESC 
-                    LIMIT {num_recs}
-                    """
+                # Metrics - one fused agg pass over the columns that are
+                # present instead of four separate column scans, and one
+                # value_counts shared by the metric and the genre chart
+                agg_spec = {col: fn for col, fn in (
+                    ('RECOMMENDATION_SCORE', 'mean'),
+                    ('ARTIST_NAME', 'nunique'),
+                    ('TRACK_POPULARITY', 'mean'),
+                ) if col in recommendations_df.columns}
+                stats = recommendations_df.agg(agg_spec) if agg_spec else {}
+                genre_counts = (recommendations_df['GENRE'].value_counts()
+                                if 'GENRE' in recommendations_df.columns
+                                else pd.Series(dtype='int64'))
+
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Avg AI Score", f"{stats.get('RECOMMENDATION_SCORE', 0):.3f}")
+
+                with col2:
+                    st.metric("Unique Genres", len(genre_counts))
+
+                with col3:
+                    st.metric("Unique Artists", int(stats.get('ARTIST_NAME', 0)))
+
+                with col4:
+                    st.metric("Avg Popularity", f"{stats.get('TRACK_POPULARITY', 0):.0f}")
+
+                # Charts - cached builders keyed on the small inputs, so
+                # reruns that don't change the recommendations reuse the
+                # serialized figures
+                if not genre_counts.empty:
+                    # Genre distribution
+                    st.plotly_chart(make_rec_genre_bar(genre_counts.head(8)),
+                                    use_container_width=True)
+
+                # Score distribution
+                if 'RECOMMENDATION_SCORE' in recommendations_df.columns:
+                    st.plotly_chart(
+                        make_rec_score_hist(recommendations_df[['RECOMMENDATION_SCORE']]),
+                        use_container_width=True
+                    )
+            
+            with rec_tab3:
+                # Export and sharing options
+                st.subheader("🔗 Export Your Playlist")
                 
-                elif strategy_type == "Content-Based":
-                    recs_query = f"""
-                    SELECT 
-                        track_id,
-                        track_name,
-                        primary_artist_name as artist_name,
-                        primary_genre as genre,
-                        album_name,
-                        track_popularity,
-                        recommendation_score,
-                        'https://open.spotify.com/track/' || track_id as spotify_url,
-                        'Content-Based Filtering' as recommendation_reason
-                    FROM ml_content_based_recommendations 
-                    WHERE recommendation_score >= {min_score}
-                    ORDER BY recommendation_score DESC 
-                    LIMIT {num_recs}
-                    """
+                # Create playlist text
+                # Assemble the export with vectorized string concat and a
+                # single join - the += loop rebuilt the whole string per row
+                df = recommendations_df
+                artists = df.get('ARTIST_NAME', df.get('PRIMARY_ARTIST_NAME'))
+                lines = (
+                    pd.Series(np.arange(1, len(df) + 1).astype(str), index=df.index)
+                    + ". " + df['TRACK_NAME'].fillna('Unknown').astype(str)
+                    + " by " + (artists.fillna('Unknown').astype(str)
+                                if artists is not None else 'Unknown')
+                )
+                if 'SPOTIFY_URL' in df.columns:
+                    lines = lines + "\n   " + df['SPOTIFY_URL'].fillna('').astype(str)
+                playlist_text = ("🎵 AI-Generated Spotify Recommendations\n\n"
+                                 + "\n\n".join(lines) + "\n")
                 
-                elif strategy_type == "Temporal Patterns":
-                    current_hour = datetime.now().hour
-                    is_weekend = datetime.now().weekday() >= 5
-                    
-                    recs_query = f"""
-                    SELECT * FROM TABLE(get_time_based_recommendations(
-                        {current_hour}, 
-                        {is_weekend}, 
-                        {num_recs}
-                    ))
-                    """
+                # Export options
+                col1, col2 = st.columns(2)
                 
-                elif strategy_type == "Discovery":
-                    discovery_type = "hidden_gems" if max_popularity < 60 else "balanced"
-                    
-                    recs_query = f"""
-                    SELECT * FROM TABLE(get_discovery_recommendations(
-                        '{discovery_type}', 
-                        {num_recs}, 
-                        {max_popularity}
-                    ))
-                    """
+                with col1:
+                    # Download as text
+                    st.download_button(
+                        label="📄 Download as Text",
+                        data=playlist_text,
+                        file_name=f"spotify_recommendations_{_now.strftime('%Y%m%d_%H%M')}.txt",
+                        mime="text/plain"
+                    )
                 
-                # Execute query
-                recommendations_df = session.sql(recs_query).to_pandas()
+                with col2:
+                    # Copy to clipboard (via text area)
+                    st.text_area(
+                        "📋 Copy Playlist",
+                        playlist_text,
+                        height=200,
+                        help="Select all and copy to share your playlist"
+                    )
                 
-                if not recommendations_df.empty:
-                    st.success(f"🎵 Generated {len(recommendations_df)} personalized recommendations!")
-                    
-                    # Display recommendations in an attractive format
-                    st.subheader("🎧 Your Personalized Playlist")
-                    
-                    # Create tabs for different views
-                    rec_tab1, rec_tab2, rec_tab3 = st.tabs(["🎵 Playlist View", "📊 Analytics", "🔗 Quick Actions"])
-                    
-                    with rec_tab1:
-                        # Display each recommendation as a card
-                        for idx, track in recommendations_df.iterrows():
-                            with st.container():
-                                col1, col2, col3 = st.columns([3, 2, 1])
-                                
-                                with col1:
-                                    # Track info with custom styling
-                                    track_name = track.get('TRACK_NAME', 'Unknown Track')
-                                    artist_name = track.get('ARTIST_NAME', track.get('PRIMARY_ARTIST_NAME', 'Unknown Artist'))
-                                    album_name = track.get('ALBUM_NAME', 'Unknown Album')
-                                    genre = track.get('GENRE', track.get('PRIMARY_GENRE', 'Unknown'))
-                                    
-                                    st.markdown(f"""
-                                    <div style="background: linear-gradient(135deg, #1DB954 0%, #1aa34a 100%); 
-                                                padding: 15px; border-radius: 10px; margin: 10px 0; 
-                                                box-shadow: 0 4px 8px rgba(0,0,0,0.3);">
-                                        <h4 style="color: white; margin: 0 0 5px 0;">{track_name}</h4>
-                                        <p style="color: #f0f0f0; margin: 0 0 5px 0;"><strong>by {artist_name}</strong></p>
-                                        <p style="color: #d0d0d0; margin: 0; font-size: 0.9em;">{album_name} • {genre}</p>
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                                
-                                with col2:
-                                    # Recommendation metrics
-                                    score = track.get('RECOMMENDATION_SCORE', track.get('TEMPORAL_SCORE', track.get('SIMILARITY_SCORE', 0)))
-                                    popularity = track.get('TRACK_POPULARITY', 0)
-                                    
-                                    st.metric("🎯 AI Score", f"{float(score):.3f}")
-                                    st.metric("📈 Popularity", f"{int(popularity)}/100")
-                                
-                                with col3:
-                                    # Quick actions
-                                    spotify_url = track.get('SPOTIFY_URL', 
-                                        f"https://open.spotify.com/track/{track.get('TRACK_ID', '')}")
-                                    
-                                    if spotify_url and 'open.spotify.com' in spotify_url:
-                                        st.markdown(f"""
-                                        <a href="{spotify_url}" target="_blank" 
-                                           style="background-color: #1DB954; color: white; padding: 10px 15px; 
-                                                  border-radius: 25px; text-decoration: none; display: inline-block;
-                                                  font-weight: bold; text-align: center; width: 80px;">
-                                            🎵 Play
-                                        </a>
-                                        """, unsafe_allow_html=True)
-                                    
-                                    # Recommendation reason
-                                    reason = track.get('RECOMMENDATION_REASON', 
-                                            track.get('SIMILARITY_REASON', 
-                                            track.get('DISCOVERY_REASON', 'AI recommended')))
-                                    st.caption(f"💡 {reason}")
-                                
-                                st.divider()
-                    
-                    with rec_tab2:
-                        # Analytics about the recommendations
-                        st.subheader("📊 Recommendation Analytics")
-                        
-                        # Metrics
-                        col1, col2, col3, col4 = st.columns(4)
-                        with col1:
-                            avg_score = recommendations_df['RECOMMENDATION_SCORE'].mean() if 'RECOMMENDATION_SCORE' in recommendations_df.columns else 0
-                            st.metric("Avg AI Score", f"{avg_score:.3f}")
-                        
-                        with col2:
-                            unique_genres = recommendations_df['GENRE'].nunique() if 'GENRE' in recommendations_df.columns else 0
-                            st.metric("Unique Genres", unique_genres)
-                        
-                        with col3:
-                            unique_artists = recommendations_df['ARTIST_NAME'].nunique() if 'ARTIST_NAME' in recommendations_df.columns else 0
-                            st.metric("Unique Artists", unique_artists)
-                        
-                        with col4:
-                            avg_popularity = recommendations_df['TRACK_POPULARITY'].mean() if 'TRACK_POPULARITY' in recommendations_df.columns else 0
-                            st.metric("Avg Popularity", f"{avg_popularity:.0f}")
-                        
-                        # Charts
-                        if 'GENRE' in recommendations_df.columns:
-                            # Genre distribution
-                            genre_counts = recommendations_df['GENRE'].value_counts().head(8)
-                            if not genre_counts.empty:
-                                fig_genres = px.bar(
-                                    x=genre_counts.values,
-                                    y=genre_counts.index,
-                                    orientation='h',
-                                    title='Recommended Genres',
-                                    labels={'x': 'Number of Tracks', 'y': 'Genre'},
-                                    color_discrete_sequence=[SPOTIFY_GREEN]
-                                )
-                                fig_genres = apply_spotify_theme(fig_genres)
-                                st.plotly_chart(fig_genres, use_container_width=True)
-                        
-                        # Score distribution
-                        if 'RECOMMENDATION_SCORE' in recommendations_df.columns:
-                            fig_scores = px.histogram(
-                                recommendations_df,
-                                x='RECOMMENDATION_SCORE',
-                                title='AI Recommendation Score Distribution',
-                                nbins=10,
-                                color_discrete_sequence=[SPOTIFY_GREEN]
-                            )
-                            fig_scores = apply_spotify_theme(fig_scores)
-                            st.plotly_chart(fig_scores, use_container_width=True)
-                    
-                    with rec_tab3:
-                        # Export and sharing options
-                        st.subheader("🔗 Export Your Playlist")
-                        
-                        # Create playlist text
-                        playlist_text = "🎵 AI-Generated Spotify Recommendations\n\n"
-                        for idx, track in recommendations_df.iterrows():
-                            track_name = track.get('TRACK_NAME', 'Unknown')
-                            artist_name = track.get('ARTIST_NAME', track.get('PRIMARY_ARTIST_NAME', 'Unknown'))
-                            spotify_url = track.get('SPOTIFY_URL', '')
-                            playlist_text += f"{idx+1}. {track_name} by {artist_name}\n   {spotify_url}\n\n"
-                        
-                        # Export options
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            # Download as text
-                            st.download_button(
-                                label="📄 Download as Text",
-                                data=playlist_text,
-                                file_name=f"spotify_recommendations_{datetime.now().strftime('%Y%m%d_%H%M')}.txt",
-                                mime="text/plain"
-                            )
-                        
-                        with col2:
-                            # Copy to clipboard (via text area)
-                            st.text_area(
-                                "📋 Copy Playlist",
-                                playlist_text,
-                                height=200,
-                                help="Select all and copy to share your playlist"
-                            )
-                        
-                        # Quick stats
-                        st.markdown("""
-                        **📊 Quick Stats:**
-                        - Total tracks: """ + str(len(recommendations_df)) + """
-                        - Strategy used: """ + strategy_type + """
-                        - Generated at: """ + datetime.now().strftime('%Y-%m-%d %H:%M:%S') + """
-                        """)
-                        
-                        # Feedback section
-                        st.markdown("---")
-                        st.subheader("💬 Feedback")
-                        
-                        feedback_col1, feedback_col2 = st.columns(2)
-                        with feedback_col1:
-                            if st.button("👍 Great recommendations!"):
-                                st.success("Thanks! The AI will learn from your positive feedback.")
-                        
-                        with feedback_col2:
-                            if st.button("👎 Not quite right"):
-                                st.info("Feedback noted! Try adjusting the filters or strategy.")
+                # Quick stats
+                st.markdown("""
+                **📊 Quick Stats:**
+                - Total tracks: """ + str(len(recommendations_df)) + """
+                - Strategy used: """ + strategy_type + """
+                - Generated at: """ + _now.strftime('%Y-%m-%d %H:%M:%S') + """
+                """)
                 
-                else:
-                    st.warning("No recommendations found. Try adjusting your filters or ensure you have enough listening history.")
-                    
-            except Exception as e:
-                st.error(f"❌ Failed to generate recommendations: {str(e)}")
-                st.info("💡 Make sure you have:")
-                st.info("• Sufficient listening history (at least 50 tracks)")
-                st.info("• The ML recommendation views are set up in Snowflake")
-                st.info("• Run the ML training scripts first")
-    
+                # Feedback section
+                st.markdown("---")
+                st.subheader("💬 Feedback")
+                
+                feedback_col1, feedback_col2 = st.columns(2)
+                with feedback_col1:
+                    if st.button("👍 Great recommendations!"):
+                        st.success("Thanks! The AI will learn from your positive feedback.")
+                
+                with feedback_col2:
+                    if st.button("👎 Not quite right"):
+                        st.info("Feedback noted! Try adjusting the filters or strategy.")
+
     # Quick recommendations section
     st.markdown("---")
     st.subheader("⚡ Quick Recommendations")
     
+    # One cached round-trip covers all three buttons; each press is then
+    # just a filter on the SRC tag of the collected Row list
+    quick_rows = load_quick_recommendations(_hour, _weekend)
+
     # Pre-built quick recommendation buttons
     quick_col1, quick_col2, quick_col3 = st.columns(3)
-    
+
     with quick_col1:
-        if st.button("🔥 Trending for Me"):
-            with st.spinner("Finding trending tracks..."):
-                try:
-                    trending_query = """
-                    SELECT 
-                        track_id,
-                        track_name,
-                        primary_artist_name as artist_name,
-                        primary_genre as genre,
-                        track_popularity,
-                        'https://open.spotify.com/track/' || track_id as spotify_url
-                    FROM ml_track_content_features 
-                    WHERE track_popularity BETWEEN 60 AND 85
-                    AND user_play_count = 0
-                    AND primary_genre IN (
-                        SELECT primary_genre FROM ml_user_genre_interactions 
-                        ORDER BY weighted_preference DESC LIMIT 3
-                    )
-                    ORDER BY track_popularity DESC, RANDOM()
-                    LIMIT 5
-                    """
-                    
-                    trending_df = session.sql(trending_query).to_pandas()
-                    
-                    if not trending_df.empty:
-                        st.success(f"🔥 Found {len(trending_df)} trending tracks!")
-                        for _, track in trending_df.iterrows():
-                            st.markdown(f"🎵 **{track['TRACK_NAME']}** by {track['ARTIST_NAME']}")
-                            st.markdown(f"   [Listen on Spotify]({track['SPOTIFY_URL']})")
-                    else:
-                        st.info("No trending tracks found. Try the full recommendation engine above!")
-                        
-                except Exception as e:
-                    st.error(f"Error: {e}")
-    
+        if st.button("🔥 Trending for Me") and quick_rows is not None:
+            trending = [r for r in quick_rows if r['SRC'] == 'trending']
+            if trending:
+                st.success(f"🔥 Found {len(trending)} trending tracks!")
+                for track in trending:
+                    st.markdown(f"🎵 **{track['TRACK_NAME']}** by {track['ARTIST_NAME']}")
+                    st.markdown(f"   [Listen on Spotify]({track['SPOTIFY_URL']})")
+            else:
+                st.info("No trending tracks found. Try the full recommendation engine above!")
+
     with quick_col2:
-        if st.button("🎯 Perfect for Now"):
-            with st.spinner("Finding perfect tracks for this moment..."):
-                try:
-                    current_hour = datetime.now().hour
-                    is_weekend = datetime.now().weekday() >= 5
-                    
-                    now_query = f"""
-                    SELECT * FROM TABLE(get_time_based_recommendations(
-                        {current_hour}, {is_weekend}, 5
-                    ))
-                    """
-                    
-                    now_df = session.sql(now_query).to_pandas()
-                    
-                    if not now_df.empty:
-                        st.success(f"🎯 Found {len(now_df)} perfect tracks for now!")
-                        for _, track in now_df.iterrows():
-                            st.markdown(f"🎵 **{track['TRACK_NAME']}** by {track['ARTIST_NAME']}")
-                            st.caption(f"Genre: {track['GENRE']} • {track['HOUR_RELEVANCE']}")
-                    else:
-                        st.info("No temporal recommendations found.")
-                        
-                except Exception as e:
-                    st.error(f"Error: {e}")
-    
+        if st.button("🎯 Perfect for Now") and quick_rows is not None:
+            now = [r for r in quick_rows if r['SRC'] == 'now']
+            if now:
+                st.success(f"🎯 Found {len(now)} perfect tracks for now!")
+                for track in now:
+                    st.markdown(f"🎵 **{track['TRACK_NAME']}** by {track['ARTIST_NAME']}")
+                    st.caption(f"Genre: {track['GENRE']} • {track['DETAIL']}")
+            else:
+                st.info("No temporal recommendations found.")
+
     with quick_col3:
-        if st.button("🔍 Discover Hidden Gems"):
-            with st.spinner("Discovering hidden gems..."):
-                try:
-                    gems_query = """
-                    SELECT * FROM TABLE(get_discovery_recommendations('hidden_gems', 5, 60))
-                    """
-                    
-                    gems_df = session.sql(gems_query).to_pandas()
-                    
-                    if not gems_df.empty:
-                        st.success(f"💎 Found {len(gems_df)} hidden gems!")
-                        for _, track in gems_df.iterrows():
-                            st.markdown(f"🎵 **{track['TRACK_NAME']}** by {track['ARTIST_NAME']}")
-                            st.caption(f"Genre: {track['GENRE']} • {track['DISCOVERY_REASON']}")
-                    else:
-                        st.info("No hidden gems found.")
-                        
-                except Exception as e:
-                    st.error(f"Error: {e}")
+        if st.button("🔍 Discover Hidden Gems") and quick_rows is not None:
+            gems = [r for r in quick_rows if r['SRC'] == 'gems']
+            if gems:
+                st.success(f"💎 Found {len(gems)} hidden gems!")
+                for track in gems:
+                    st.markdown(f"🎵 **{track['TRACK_NAME']}** by {track['ARTIST_NAME']}")
+                    st.caption(f"Genre: {track['GENRE']} • {track['DETAIL']}")
+            else:
+                st.info("No hidden gems found.")
 
 st.markdown("---")
 st.markdown("### 🎵 Data powered by your Spotify listening history")
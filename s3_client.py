@@ -9,6 +9,12 @@ from botocore.exceptions import ClientError, NoCredentialsError
 import structlog
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 from config import settings
 
 logger = structlog.get_logger(__name__)
@@ -113,11 +119,18 @@ class S3Client:
         s3_key = self.generate_s3_key(timestamp, f"batch_{len(tracks)}")
         
         try:
-            # Convert tracks to JSONL format (one JSON object per line)
-            jsonl_data = "\n".join(json.dumps(track, ensure_ascii=False) for track in tracks)
-            
+            # Convert tracks to JSONL format (one JSON object per line).
+            # orjson serializes straight to UTF-8 bytes, skipping the
+            # str-encode round trip; stdlib json remains the fallback.
+            if HAS_ORJSON:
+                jsonl_bytes = b"\n".join(orjson.dumps(track) for track in tracks)
+            else:
+                jsonl_bytes = "\n".join(
+                    json.dumps(track, ensure_ascii=False) for track in tracks
+                ).encode('utf-8')
+
             # Compress the data
-            compressed_data = gzip.compress(jsonl_data.encode('utf-8'))
+            compressed_data = gzip.compress(jsonl_bytes)
             
             # Upload to S3
             self.s3_client.put_object(